@@ -12,10 +12,17 @@ import sys
 from datetime import datetime
 import subprocess
 import json
+import time
 import argparse
 import warnings
 from pathlib import Path
 import shutil
+import re
+import html
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import fnmatch
+import multiprocessing
+import unicodedata
 from typing import Optional, Any, Dict, List
 
 # Try to import optional dependencies with fallbacks
@@ -74,11 +81,154 @@ if MATPLOTLIB_AVAILABLE:
 # Suprimir warnings desnecessários
 warnings.filterwarnings('ignore')
 
+# Limiares padrão por método de detecção de outliers
+# (iqr: múltiplo do IQR, mad: z-score modificado, zscore: desvios-padrão)
+OUTLIER_DEFAULT_THRESHOLDS = {"iqr": 1.5, "mad": 3.5, "zscore": 3.0}
+
+# Chaves de configuração que invalidam cada etapa no modo --watch
+WATCH_VALIDATION_KEYS = ("outlier_", "category_")
+WATCH_TREND_KEYS = ("trend_",)
+WATCH_CHART_KEYS = ("chart_", "facet_")
+
+# Níveis do fator Cultura usados pelo script R (demais valores viram NA)
+R_CULTURE_LEVELS = ["Arroz", "Feijão"]
+
+# Multiplicador do tamanho em memória da base para o pico de uso do pipeline
+# (base bruta + cópia validada + temporários; leitura de xlsx cria objetos por célula)
+MEMORY_WORKING_SET_FACTOR = {"csv": 4, "xlsx": 8}
+
+# Colunas esperadas em toda fonte de dados
+EXPECTED_COLUMNS = ["Safra", "Regiao", "Cultura", "Subtipo", "Produtividade_t_ha", "Nivel_Tecnologico"]
+
+
+class StreamingSummary:
+    """Acumula estatísticas de produtividade por grupo, bloco a bloco"""
+
+    def __init__(self, bins=20000, value_range=(0.0, 20.0)):
+        self.edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        self.groups = {}
+
+    def update(self, labels, values):
+        """Incorpora um bloco (rótulos de grupo e valores já limpos)"""
+        if len(values) == 0:
+            return
+        labels = pd.Series(labels, dtype=object).fillna("NA").to_numpy()
+        codes, uniques = pd.factorize(labels)
+        agg = pd.Series(values).groupby(codes).agg(["size", "mean", "var", "min", "max"])
+        bin_index = np.clip(np.searchsorted(self.edges, values, side="right") - 1,
+                            0, len(self.edges) - 2)
+
+        for code, row in agg.iterrows():
+            label = uniques[code]
+            n_b, mean_b = int(row["size"]), row["mean"]
+            m2_b = row["var"] * (n_b - 1) if n_b > 1 else 0.0
+            hist_b = np.bincount(bin_index[codes == code], minlength=len(self.edges) - 1)
+
+            state = self.groups.get(label)
+            if state is None:
+                self.groups[label] = {"n": n_b, "mean": mean_b, "m2": m2_b,
+                                      "min": row["min"], "max": row["max"], "hist": hist_b}
+                continue
+
+            # Combinação de médias e variâncias (Chan et al.)
+            n = state["n"] + n_b
+            delta = mean_b - state["mean"]
+            state["mean"] += delta * n_b / n
+            state["m2"] += m2_b + delta ** 2 * state["n"] * n_b / n
+            state["n"] = n
+            state["min"] = min(state["min"], row["min"])
+            state["max"] = max(state["max"], row["max"])
+            state["hist"] += hist_b
+
+    def quantile(self, label, q):
+        """Quantil aproximado pelo histograma (interpolação linear dentro do bin)"""
+        state = self.groups[label]
+        rank = q * (state["n"] - 1)
+        cumulative = np.cumsum(state["hist"])
+        idx = int(np.searchsorted(cumulative, rank, side="right"))
+        before = cumulative[idx - 1] if idx > 0 else 0
+        fraction = (rank - before + 0.5) / state["hist"][idx]
+        low, high = self.edges[idx], self.edges[idx + 1]
+        return float(np.clip(low + fraction * (high - low), state["min"], state["max"]))
+
+    def summary(self, label):
+        """Estatísticas no mesmo formato de generate_statistics"""
+        state = self.groups[label]
+        return {
+            'n': state["n"],
+            'media': state["mean"],
+            'mediana': self.quantile(label, 0.5),
+            'desvio_padrao': np.sqrt(state["m2"] / (state["n"] - 1)) if state["n"] > 1 else np.nan,
+            'minimo': state["min"],
+            'maximo': state["max"],
+            'q1': self.quantile(label, 0.25),
+            'q3': self.quantile(label, 0.75)
+        }
+
+
+def _render_panel_batch(panels, output_dir, figsize, dpi, ylim):
+    """Renderiza um lote de painéis reutilizando uma única figura (também usado em processos filhos)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.transforms import blended_transform_factory
+    from PIL import Image
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    # Layout e eixo y fixos: o fundo (moldura, eixo y, grade) é desenhado uma
+    # única vez e restaurado a cada painel; só caixas e textos são redesenhados
+    fig.subplots_adjust(left=0.12, right=0.97, top=0.88, bottom=0.18)
+    ax.set_ylim(ylim)
+    ax.set_ylabel("Produtividade (t/ha)")
+    ax.set_xticks([])
+    ax.grid(True, alpha=0.3, axis='y')
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    label_transform = blended_transform_factory(ax.transData, ax.transAxes)
+
+    for panel in panels:
+        canvas.restore_region(background)
+        boxes = panel["boxes"]
+        ax.set_xlim(0.5, len(boxes) + 0.5)
+        artists = [a for items in ax.bxp(boxes, showfliers=False, manage_ticks=False).values() for a in items]
+        artists += [ax.text(i, -0.03, box["label"], transform=label_transform, ha='center', va='top')
+                    for i, box in enumerate(boxes, start=1)]
+        artists.append(ax.text(0.5, 1.03, panel["title"], transform=ax.transAxes, ha='center',
+                               va='bottom', fontsize=12, fontweight='bold'))
+        for artist in artists:
+            ax.draw_artist(artist)
+
+        width, height = canvas.get_width_height()
+        Image.frombuffer("RGBA", (width, height), canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(
+            os.path.join(output_dir, panel["file"]), compress_level=1)
+        for artist in artists:
+            artist.remove()
+    return len(panels)
+
+def _read_source(path, sheet=None):
+    """Lê uma fonte (CSV ou aba de planilha) e o tempo gasto (também usado em processos filhos)"""
+    started = time.perf_counter()
+    if path.endswith('.csv'):
+        frame = pd.read_csv(path, encoding='utf-8')
+    elif path.endswith('.xlsx') or path.endswith('.xls'):
+        frame = pd.read_excel(path, sheet_name=0 if sheet is None else sheet)
+    else:
+        raise ValueError("Formato de arquivo não suportado. Use .xlsx, .xls ou .csv")
+    return frame, time.perf_counter() - started
+
 class AgroAnalysisSystem:
     """Sistema integrado de análise de dados do agronegócio"""
     
     def __init__(self, config_file=None, **kwargs):
         self.data = None
+        self.raw_data = None
+        self.execution_strategy = None
+        self.sample_info = None
+        self.panels_rendered = False
+        self.source_info = None
+        self.config_file = config_file
+        self.config_overrides = kwargs
         self.config = self._load_config(config_file)
         
         # Aplicar configurações adicionais passadas via kwargs
@@ -94,22 +244,50 @@ class AgroAnalysisSystem:
         # Criar diretórios necessários
         self._create_directories()
         
-    def _load_config(self, config_file=None):
-        """Carrega configurações do sistema"""
+    def _load_config(self, config_file=None, strict=False):
+        """Carrega configurações do sistema (strict: propaga erros de leitura do JSON)"""
         default_config = {
             "autora": "Raimunda Nayara Mendes dos Santos",
             "rm": "567718",
             "fase": 2,
             "capitulo": 7,
             "data_file": "base_agro.xlsx",
+            "data_sources": [],
+            "source_column": "Fonte",
+            "ingest_workers": None,
             "output_format": "csv",
             "charts_format": "png",
             "language": "pt-BR",
             "r_script_path": "Rscript",
             "r_script_file": "ENTREGA_Fase2_Cap7.R",
+            "r_backend": "nativo",
+            "r_output_dir": "document/relatorios",
+            "max_memory_mb": None,
             "chart_theme": "whitegrid",
             "chart_dpi": 120,
-            "chart_size": (10, 6)
+            "chart_size": (10, 6),
+            "facet_panels": False,
+            "facet_size": (6, 4),
+            "facet_dpi": 90,
+            "facet_workers": None,
+            "trend_series": ["Cultura", "Regiao", "Nivel_Tecnologico"],
+            "trend_window": 3,
+            "sample_strata": ["Cultura", "Regiao", "Safra"],
+            "sample_chunk_rows": 200000,
+            "sample_seed": None,
+            "outlier_method": "iqr",
+            "outlier_action": "flag",
+            "outlier_threshold": None,
+            "outlier_group_cols": ["Cultura", "Regiao", "Safra"],
+            "outlier_min_group_size": 5,
+            "outlier_min_spread": 0.1,
+            "category_columns": ["Regiao", "Cultura", "Subtipo", "Nivel_Tecnologico"],
+            "category_canonical": {
+                "Cultura": ["Arroz", "Feijão", "Soja", "Milho"],
+                "Nivel_Tecnologico": ["Baixo", "Médio", "Alto"],
+                "Regiao": ["Brasil", "Ceará", "Norte", "Nordeste", "Centro-Oeste", "Sudeste", "Sul"]
+            },
+            "category_aliases": {}
         }
         
         if config_file and os.path.exists(config_file):
@@ -118,6 +296,8 @@ class AgroAnalysisSystem:
                     custom_config = json.load(f)
                     default_config.update(custom_config)
             except Exception as e:
+                if strict:
+                    raise
                 print(f"Erro ao carregar configuração personalizada: {e}")
                 
         return default_config
@@ -180,14 +360,17 @@ class AgroAnalysisSystem:
         return False
     
     def load_data(self, file_path=None):
-        """Carrega dados do arquivo Excel"""
+        """Carrega dados de um arquivo Excel/CSV ou de várias fontes (lista ou data_sources)"""
         if not PANDAS_AVAILABLE:
             print("pandas não disponível. Não é possível carregar dados.")
             print("   Execute: pip install pandas")
             return False
             
         if file_path is None:
-            file_path = self.config["data_file"]
+            file_path = self.config.get("data_sources") or self.config["data_file"]
+        if isinstance(file_path, (list, tuple)):
+            return self.load_sources(file_path)
+        self.source_info = None
         
         try:
             if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
@@ -196,6 +379,9 @@ class AgroAnalysisSystem:
                 self.data = pd.read_csv(file_path, encoding='utf-8')
             else:
                 raise ValueError("Formato de arquivo não suportado. Use .xlsx, .xls ou .csv")
+
+            # Referência à base bruta (validate_data trabalha sobre uma cópia)
+            self.raw_data = self.data
             
             print(f"Dados carregados: {len(self.data)} registros, {len(self.data.columns)} colunas")
             return True
@@ -206,7 +392,370 @@ class AgroAnalysisSystem:
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
             return False
-    
+
+    @staticmethod
+    def _parse_source_spec(spec):
+        """Interpreta 'arquivo.csv', 'planilha.xlsx:aba1,aba2' ou {"arquivo": ..., "abas": [...]}"""
+        if isinstance(spec, dict):
+            path, sheets = spec["arquivo"], spec.get("abas")
+            if isinstance(sheets, (str, int)):
+                sheets = [sheets]
+            return str(path), list(sheets) if sheets else None
+
+        match = re.fullmatch(r"(.+\.xlsx?)(?::(.*))?", str(spec), re.IGNORECASE)
+        if not match or not match.group(2):
+            return str(spec), None
+        sheets = [s.strip() for s in match.group(2).split(",")]
+        return match.group(1), [s for s in sheets if s] or None
+
+    def resolve_sources(self, specs):
+        """Expande as fontes em tarefas de leitura (arquivo, aba); seletores aceitam nome, índice ou curinga
+
+        Um seletor numérico é tratado como nome quando existe aba com esse nome (ex.: '2020').
+        """
+        tasks = []
+        for spec in specs:
+            path, selectors = self._parse_source_spec(spec)
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            if path.endswith('.csv') or not selectors:
+                tasks.append({"arquivo": path, "aba": None, "fonte": os.path.basename(path)})
+                continue
+
+            with pd.ExcelFile(path) as workbook:
+                names = workbook.sheet_names
+            chosen = []
+            for selector in selectors:
+                if str(selector) in map(str, names):
+                    matches = [n for n in names if str(n) == str(selector)]
+                elif isinstance(selector, int) or selector.isdigit():
+                    selector = int(selector)
+                    if selector >= len(names):
+                        raise ValueError(f"{path}: aba de índice {selector} inexistente ({len(names)} abas)")
+                    matches = [names[selector]]
+                else:
+                    matches = [n for n in names if fnmatch.fnmatchcase(str(n), selector)]
+                    if not matches:
+                        raise ValueError(f"{path}: nenhuma aba corresponde a '{selector}' "
+                                         f"(disponíveis: {', '.join(map(str, names))})")
+                chosen += [n for n in matches if n not in chosen]
+            tasks += [{"arquivo": path, "aba": name, "fonte": f"{os.path.basename(path)}[{name}]"}
+                      for name in chosen]
+        return tasks
+
+    def _conform_source(self, frame):
+        """Alinha uma fonte ao esquema esperado; retorna (quadro ou None, colunas faltando, colunas extras)"""
+        # Cabeçalhos com grafias diferentes (acentos, caixa, espaços) são renomeados
+        folded = {self._fold_category(c): c for c in EXPECTED_COLUMNS}
+        frame = frame.rename(columns={c: folded[self._fold_category(c)] for c in frame.columns
+                                      if self._fold_category(c) in folded and c not in EXPECTED_COLUMNS})
+        missing = [c for c in EXPECTED_COLUMNS if c not in frame.columns]
+        extra = [str(c) for c in frame.columns if c not in EXPECTED_COLUMNS]
+        if missing:
+            return None, missing, extra
+
+        frame = frame.copy()
+        frame["Safra"] = self._conform_safra(frame["Safra"])
+        frame["Produtividade_t_ha"] = pd.to_numeric(frame["Produtividade_t_ha"], errors="coerce")
+        for column in ("Regiao", "Cultura", "Subtipo", "Nivel_Tecnologico"):
+            frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+        return frame, missing, extra
+
+    @staticmethod
+    def _conform_safra(labels):
+        """Safra numérica quando todos os valores são anos; senão rótulos de texto ('2021/22')"""
+        numeric = pd.to_numeric(labels, errors="coerce")
+        present = labels.notna()
+        if numeric[present].notna().all():
+            if present.all() and (numeric % 1 == 0).all():
+                return numeric.astype("int64")
+            return numeric
+        return labels.map(AgroAnalysisSystem._safra_label)
+
+    @staticmethod
+    def _safra_label(value):
+        """Rótulo de texto de uma safra (2021.0 -> '2021'); ausentes continuam ausentes"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        if isinstance(value, (int, float, np.integer, np.floating)) and float(value).is_integer():
+            return str(int(value))
+        return str(value).strip()
+
+    def _report_unparsed_safra(self, label, frame):
+        """Informa rótulos de Safra que não puderam ser interpretados como ano"""
+        labels = frame["Safra"]
+        unparsed = labels[labels.notna().to_numpy() & np.isnan(self._safra_years(labels))]
+        if len(unparsed):
+            values = list(dict.fromkeys(map(str, unparsed)))
+            print(f"Fonte {label}: {len(unparsed)} valores de Safra não reconhecidos como ano: "
+                  f"{', '.join(values[:5])}{' ...' if len(values) > 5 else ''}")
+
+    def _report_source_schema(self, label, missing, extra):
+        """Informa divergências de esquema de uma fonte"""
+        if missing:
+            print(f"Fonte ignorada ({label}): colunas faltando: {', '.join(missing)}")
+        elif extra:
+            print(f"Fonte {label}: colunas extras mantidas: {', '.join(extra)}")
+
+    def load_sources(self, specs):
+        """Carrega várias fontes em paralelo e concatena em uma única base com coluna de procedência"""
+        try:
+            tasks = self.resolve_sources(specs)
+        except FileNotFoundError as e:
+            print(f"Arquivo não encontrado: {e.filename or e}")
+            return False
+        except Exception as e:
+            print(f"Erro ao resolver fontes de dados: {e}")
+            return False
+        if not tasks:
+            print("Nenhuma fonte de dados informada")
+            return False
+
+        started = time.perf_counter()
+        workers = self.config.get("ingest_workers") or min(len(tasks), os.cpu_count() or 1)
+        results = {}
+        try:
+            if len(tasks) == 1 or workers <= 1:
+                for i, task in enumerate(tasks):
+                    results[i] = _read_source(task["arquivo"], task["aba"])
+            else:
+                # O parser CSV libera o GIL (threads); o openpyxl não, então planilhas vão para processos.
+                # Os processos usam "spawn": fork com threads de leitura ativas pode travar os filhos
+                excel = [i for i, t in enumerate(tasks) if not t["arquivo"].endswith('.csv')]
+                csv = [i for i, t in enumerate(tasks) if t["arquivo"].endswith('.csv')]
+                with ProcessPoolExecutor(max_workers=max(min(workers, len(excel)), 1),
+                                         mp_context=multiprocessing.get_context("spawn")) as processes, \
+                        ThreadPoolExecutor(max_workers=max(min(workers, len(csv)), 1)) as threads:
+                    futures = {i: processes.submit(_read_source, tasks[i]["arquivo"], tasks[i]["aba"])
+                               for i in excel}
+                    futures.update({i: threads.submit(_read_source, tasks[i]["arquivo"], tasks[i]["aba"])
+                                    for i in csv})
+                    for i, future in futures.items():
+                        results[i] = future.result()
+        except Exception as e:
+            print(f"Erro ao carregar fontes de dados: {e}")
+            return False
+
+        source_column = self.config["source_column"]
+        frames, info = [], []
+        for i, task in enumerate(tasks):
+            frame, elapsed = results[i]
+            conformed, missing, extra = self._conform_source(frame)
+            self._report_source_schema(task["fonte"], missing, extra)
+            if conformed is not None:
+                self._report_unparsed_safra(task["fonte"], conformed)
+            info.append({"fonte": task["fonte"], "arquivo": task["arquivo"], "aba": task["aba"],
+                         "registros": len(frame), "segundos": round(elapsed, 3),
+                         "status": "carregada" if conformed is not None else "ignorada"})
+            if conformed is not None:
+                conformed[source_column] = task["fonte"]
+                frames.append(conformed)
+        self.source_info = info
+
+        if not frames:
+            print("Nenhuma fonte compatível com o esquema esperado")
+            return False
+
+        data = pd.concat(frames, ignore_index=True, sort=False)
+        if data["Safra"].dtype == object:
+            # Fontes numéricas e rotuladas juntas: todas as safras viram rótulos de texto
+            data["Safra"] = data["Safra"].map(self._safra_label)
+        data[source_column] = pd.Categorical(data[source_column], categories=list(dict.fromkeys(
+            r["fonte"] for r in info if r["status"] == "carregada")))
+        self.data = data
+        self.raw_data = self.data
+
+        pd.DataFrame(info).to_csv(self.reports_dir / "fontes_carregadas.csv", index=False)
+        wall = time.perf_counter() - started
+        print(f"Dados carregados: {len(self.data)} registros, {len(self.data.columns)} colunas "
+              f"de {len(frames)}/{len(tasks)} fontes")
+        print(f"Leitura em {wall:.2f}s (soma das fontes: {sum(r['segundos'] for r in info):.2f}s)")
+        return True
+
+    @staticmethod
+    def _parse_memory_size(text):
+        """Converte '512M', '2G' ou '1500' (MB) em megabytes"""
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(text), re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Tamanho de memória inválido: {text}")
+        factor = {"K": 1 / 1024, "": 1, "M": 1, "G": 1024, "T": 1024 ** 2}[match.group(2).upper()]
+        return float(match.group(1)) * factor
+
+    @staticmethod
+    def _current_rss_mb():
+        """Memória residente atual do processo (MB)"""
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+        except (OSError, ValueError, AttributeError):
+            return AgroAnalysisSystem._peak_rss_mb()
+
+    @staticmethod
+    def _peak_rss_mb():
+        """Pico de memória residente do processo (MB)"""
+        try:
+            import resource
+        except ImportError:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss é reportado em bytes no macOS e em KB no Linux
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+    def estimate_memory_footprint(self, file_path=None, sample_rows=1000, sheet=None):
+        """Estima o uso de memória da base a partir do tamanho do arquivo e de uma amostra inicial"""
+        if file_path is None and self.config.get("data_sources"):
+            return self._estimate_sources_footprint(sample_rows)
+        if file_path is None:
+            file_path = self.config["data_file"]
+        file_size = os.path.getsize(file_path)
+
+        if file_path.endswith('.csv'):
+            sample = pd.read_csv(file_path, nrows=sample_rows, encoding='utf-8')
+            with open(file_path, 'rb') as f:
+                header_bytes = len(f.readline())
+                sample_bytes = sum(len(f.readline()) for _ in range(len(sample)))
+            file_bytes_per_row = sample_bytes / max(len(sample), 1)
+            rows = int((file_size - header_bytes) / file_bytes_per_row) if file_bytes_per_row else 0
+            kind = "csv"
+        elif file_path.endswith('.xlsx'):
+            from openpyxl import load_workbook
+            workbook = load_workbook(file_path, read_only=True)
+            worksheet = workbook.active if sheet is None else workbook[sheet]
+            if worksheet.max_row is None:
+                # Planilha sem <dimension>: contagem por leitura em streaming
+                worksheet.reset_dimensions()
+                total = sum(1 for _ in worksheet.iter_rows(values_only=True))
+            else:
+                total = worksheet.max_row
+            rows = max(total - 1, 0)
+            workbook.close()
+            sample = pd.read_excel(file_path, nrows=sample_rows, sheet_name=0 if sheet is None else sheet)
+            kind = "xlsx"
+        else:
+            sample = pd.read_excel(file_path, nrows=sample_rows, sheet_name=0 if sheet is None else sheet)
+            rows = len(sample)
+            kind = "xlsx"
+
+        bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1)
+        return {
+            "arquivo_mb": file_size / 1024 ** 2,
+            "registros_estimados": rows,
+            "bytes_por_registro": bytes_per_row,
+            "estimado_mb": rows * bytes_per_row * MEMORY_WORKING_SET_FACTOR[kind] / 1024 ** 2,
+            "fator": MEMORY_WORKING_SET_FACTOR[kind],
+        }
+
+    def _estimate_sources_footprint(self, sample_rows=1000):
+        """Soma as estimativas de memória de todas as fontes configuradas"""
+        estimates = [self.estimate_memory_footprint(task["arquivo"], sample_rows, task["aba"])
+                     for task in self.resolve_sources(self.config["data_sources"])]
+        total_rows = sum(e["registros_estimados"] for e in estimates)
+        estimated_mb = sum(e["estimado_mb"] for e in estimates)
+        working_bytes = sum(e["registros_estimados"] * e["bytes_por_registro"] * e["fator"] for e in estimates)
+        bytes_per_row = sum(e["registros_estimados"] * e["bytes_por_registro"] for e in estimates)
+        return {
+            "arquivo_mb": sum(os.path.getsize(p) for p in self._data_paths()) / 1024 ** 2,
+            "registros_estimados": total_rows,
+            "bytes_por_registro": bytes_per_row / max(total_rows, 1),
+            "estimado_mb": estimated_mb,
+            "fator": working_bytes / max(bytes_per_row, 1),
+        }
+
+    def _data_paths(self):
+        """Arquivos de dados configurados (fontes múltiplas ou data_file)"""
+        if self.config.get("data_sources"):
+            return list(dict.fromkeys(self._parse_source_spec(s)[0] for s in self.config["data_sources"]))
+        return [self.config["data_file"]]
+
+    def choose_execution_strategy(self, file_path=None):
+        """Escolhe execução em memória ou em blocos (out-of-core) conforme o orçamento de memória"""
+        budget = self.config.get("max_memory_mb")
+        if not budget:
+            self.execution_strategy = {"estrategia": "memoria"}
+            return self.execution_strategy
+
+        estimate = self.estimate_memory_footprint(file_path)
+        paths = [file_path] if file_path else self._data_paths()
+        baseline = self._current_rss_mb()
+        available = budget - baseline
+
+        if available <= 0:
+            strategy = {"estrategia": "insuficiente"}
+        elif estimate["estimado_mb"] <= available:
+            strategy = {"estrategia": "memoria"}
+        else:
+            # Metade da folga para o bloco; o restante cobre acumuladores e gráficos
+            bytes_per_row = estimate["bytes_por_registro"] * estimate["fator"]
+            chunk_rows = int(available * 0.5 * 1024 ** 2 / max(bytes_per_row, 1))
+            if chunk_rows < 1000:
+                print(f"Aviso: a folga de {available:.0f} MB comporta apenas {chunk_rows} linhas por bloco; "
+                      f"usando o mínimo de 1000 linhas, o que pode exceder o orçamento")
+            strategy = {"estrategia": "blocos", "linhas_por_bloco": max(chunk_rows, 1000)}
+            if any(p.endswith('.xls') for p in paths):
+                print("Arquivos .xls não suportam leitura em blocos; usando execução em memória")
+                strategy = {"estrategia": "memoria"}
+
+        strategy.update(estimate, orcamento_mb=budget, base_processo_mb=baseline)
+        self.execution_strategy = strategy
+
+        print(f"Orçamento de memória: {budget:.0f} MB (processo já usa {baseline:.0f} MB)")
+        if strategy["estrategia"] == "insuficiente":
+            print(f"Orçamento de memória abaixo do uso atual do processo; "
+                  f"use --max-memory acima de {baseline:.0f} MB")
+            return strategy
+        print(f"Estimativa: ~{estimate['registros_estimados']} registros, "
+              f"~{estimate['estimado_mb']:.0f} MB no pipeline em memória")
+        if strategy["estrategia"] == "blocos":
+            print(f"Estratégia: carga/validação/estatísticas em blocos de "
+                  f"{strategy['linhas_por_bloco']} linhas; gráficos e relatório a partir dos agregados")
+        else:
+            print("Estratégia: todas as etapas em memória")
+        return strategy
+
+    def _iter_data_chunks(self, chunk_rows, file_path=None):
+        """Blocos da base configurada: um arquivo ou todas as fontes em sequência, com procedência"""
+        if file_path is not None or not self.config.get("data_sources"):
+            yield from self._iter_chunks(file_path or self.config["data_file"], chunk_rows)
+            return
+
+        source_column = self.config["source_column"]
+        for task in self.resolve_sources(self.config["data_sources"]):
+            for i, chunk in enumerate(self._iter_chunks(task["arquivo"], chunk_rows, task["aba"])):
+                chunk, missing, extra = self._conform_source(chunk)
+                if i == 0:
+                    self._report_source_schema(task["fonte"], missing, extra)
+                if chunk is None:
+                    break
+                if i == 0:
+                    self._report_unparsed_safra(task["fonte"], chunk)
+                # Rótulos de texto mantêm o mesmo tipo de chave entre fontes e blocos
+                chunk["Safra"] = chunk["Safra"].map(self._safra_label)
+                chunk[source_column] = task["fonte"]
+                yield chunk
+
+    def _iter_chunks(self, file_path, chunk_rows, sheet=None):
+        """Lê a base em blocos de linhas (CSV via pandas, xlsx via openpyxl em modo streaming)"""
+        if file_path.endswith('.csv'):
+            yield from pd.read_csv(file_path, encoding='utf-8', chunksize=chunk_rows)
+            return
+
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            worksheet = workbook.active if sheet is None else workbook[sheet]
+            rows = worksheet.iter_rows(values_only=True)
+            header = list(next(rows))
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunk_rows:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+
     def validate_data(self):
         """Valida e limpa os dados"""
         if self.data is None:
@@ -216,8 +765,7 @@ class AgroAnalysisSystem:
         self.validation_messages = []
         
         # Verificar colunas esperadas
-        expected_columns = ["Safra", "Regiao", "Cultura", "Subtipo", "Produtividade_t_ha", "Nivel_Tecnologico"]
-        missing_columns = [col for col in expected_columns if col not in self.data.columns]
+        missing_columns = [col for col in EXPECTED_COLUMNS if col not in self.data.columns]
         
         if missing_columns:
             self.validation_messages.append(f"Colunas faltando: {', '.join(missing_columns)}")
@@ -238,12 +786,18 @@ class AgroAnalysisSystem:
         
         # Limpeza dos dados
         self.data = self.data.copy()
-        
+
+        # Padronizar grafias das colunas categóricas
+        self.normalize_categories()
+
         if "Produtividade_t_ha" in self.data.columns:
             # Remover valores NA e capar valores extremos
             self.data = self.data.dropna(subset=["Produtividade_t_ha"])
             self.data["Produtividade_t_ha"] = self.data["Produtividade_t_ha"].clip(0, 20)
-        
+
+            # Outliers relativos ao grupo (cultura/região/safra)
+            self.detect_outliers()
+
         # Converter Cultura para categoria
         if "Cultura" in self.data.columns:
             self.data["Cultura"] = pd.Categorical(self.data["Cultura"])
@@ -255,7 +809,178 @@ class AgroAnalysisSystem:
                 print(f"   - {msg}")
         
         return True
-    
+
+    @staticmethod
+    def _fold_category(value):
+        """Chave de comparação sem acentos, caixa ou espaços extras"""
+        text = unicodedata.normalize("NFKD", str(value))
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        return re.sub(r"\s+", " ", text).strip().casefold()
+
+    def normalize_categories(self):
+        """Padroniza grafias nas colunas categóricas operando sobre o dicionário de categorias"""
+        if self.data is None:
+            return False
+
+        remappings = self._normalize_frame_categories(self.data)
+        self._report_category_remappings(remappings)
+        return True
+
+    def _normalize_frame_categories(self, frame, lookups=None):
+        """Normaliza as colunas categóricas de um DataFrame e retorna os remapeamentos
+
+        Na leitura em blocos, o mesmo dicionário ``lookups`` é passado a todos os blocos:
+        a grafia escolhida para cada chave no primeiro bloco em que ela aparece é mantida
+        nos seguintes, evitando rótulos diferentes para a mesma categoria.
+        """
+        if lookups is None:
+            lookups = {}
+        canonical = self.config.get("category_canonical", {})
+        aliases = self.config.get("category_aliases", {})
+        remappings = []
+
+        for column in self.config.get("category_columns", []):
+            if column not in frame.columns:
+                continue
+
+            values = frame[column].astype("category")
+            categories = values.cat.categories
+            codes = values.cat.codes.to_numpy()
+            if len(categories) == 0:
+                continue
+
+            # Mapa chave normalizada -> grafia canônica (canônicos + aliases do config)
+            if column not in lookups:
+                lookups[column] = {self._fold_category(v): v for v in canonical.get(column, [])}
+                for alias, target in aliases.get(column, {}).items():
+                    lookups[column][self._fold_category(alias)] = target
+            lookup = lookups[column]
+
+            # Sem canônico configurado, a grafia mais frequente da chave vence
+            counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+            keys = [self._fold_category(c) for c in categories]
+            for key, category, count in sorted(zip(keys, categories, counts), key=lambda t: -t[2]):
+                lookup.setdefault(key, re.sub(r"\s+", " ", str(category)).strip())
+
+            targets = [lookup[key] for key in keys]
+            new_categories = list(dict.fromkeys(targets))
+            if new_categories == list(categories):
+                continue
+
+            # Remapear códigos: custo proporcional ao número de categorias distintas
+            position = {target: i for i, target in enumerate(new_categories)}
+            code_map = np.array([position[t] for t in targets], dtype=codes.dtype)
+            new_codes = np.where(codes >= 0, code_map[codes], -1)
+            frame[column] = pd.Categorical.from_codes(new_codes, categories=new_categories)
+
+            for category, target, count in zip(categories, targets, counts):
+                if category != target:
+                    remappings.append({"coluna": column, "original": category,
+                                       "normalizado": target, "registros": int(count)})
+
+        return remappings
+
+    def _report_category_remappings(self, remappings):
+        """Registra os remapeamentos de categorias em CSV e nas mensagens de validação"""
+        report_path = self.reports_dir / "normalizacao_categorias.csv"
+        if remappings:
+            pd.DataFrame(remappings).to_csv(report_path, index=False)
+            total = sum(r["registros"] for r in remappings)
+            self.validation_messages.append(
+                f"Categorias normalizadas: {len(remappings)} grafias remapeadas ({total} registros)")
+            for r in remappings:
+                self.validation_messages.append(
+                    f"{r['coluna']}: '{r['original']}' → '{r['normalizado']}' ({r['registros']} registros)")
+        elif report_path.exists():
+            report_path.unlink()
+
+    def _discard_outlier_report(self):
+        """Remove o relatório de outliers de uma execução anterior"""
+        report_path = self.reports_dir / "outliers_por_grupo.csv"
+        if report_path.exists():
+            report_path.unlink()
+
+    def detect_outliers(self, column="Produtividade_t_ha"):
+        """Detecta outliers por grupo (IQR, MAD ou z-score) de forma vetorizada"""
+        method = self.config.get("outlier_method")
+        if not method or method == "nenhum":
+            self._discard_outlier_report()
+            return True
+        if method not in OUTLIER_DEFAULT_THRESHOLDS:
+            print(f"Método de outlier desconhecido: {method}")
+            return False
+        if self.data is None or column not in self.data.columns or len(self.data) == 0:
+            return False
+
+        threshold = self.config.get("outlier_threshold")
+        if threshold is None:
+            threshold = OUTLIER_DEFAULT_THRESHOLDS[method]
+        action = self.config.get("outlier_action", "flag")
+        group_cols = [c for c in self.config.get("outlier_group_cols", []) if c in self.data.columns]
+
+        values = self.data[column].to_numpy(dtype=float)
+
+        # Códigos inteiros de grupo calculados uma única vez; todas as estatísticas
+        # são agregadas por código e propagadas às linhas por indexação
+        if group_cols:
+            codes = self.data.groupby(group_cols, sort=False, observed=True,
+                                      dropna=False).ngroup().to_numpy()
+        else:
+            codes = np.zeros(len(values), dtype=np.int64)
+        grouped = pd.Series(values).groupby(codes, sort=True)
+        sizes = grouped.size().to_numpy()[codes]
+
+        if method == "iqr":
+            q1 = grouped.quantile(0.25).to_numpy()[codes]
+            q3 = grouped.quantile(0.75).to_numpy()[codes]
+            # IQR nulo é comum com dados arredondados; o piso configurável evita ignorar o grupo
+            spread = np.maximum(q3 - q1, self.config.get("outlier_min_spread") or 0.0)
+            lower = q1 - threshold * spread
+            upper = q3 + threshold * spread
+        elif method == "mad":
+            center = grouped.median().to_numpy()[codes]
+            deviation = pd.Series(np.abs(values - center)).groupby(codes, sort=True)
+            mad = deviation.median().to_numpy()[codes]
+            # 0.6745 converte o MAD em escala comparável ao desvio-padrão; com MAD nulo,
+            # usa-se o desvio absoluto médio × 1.2533 (Iglewicz–Hoaglin)
+            spread = np.where(mad > 0, mad / 0.6745, deviation.mean().to_numpy()[codes] * 1.2533)
+            lower = center - threshold * spread
+            upper = center + threshold * spread
+        else:
+            center = grouped.mean().to_numpy()[codes]
+            spread = grouped.std().to_numpy()[codes]
+            lower = center - threshold * spread
+            upper = center + threshold * spread
+
+        # Grupos pequenos ou sem dispersão não têm estatística robusta confiável
+        assessable = (sizes >= self.config.get("outlier_min_group_size", 5)) & (spread > 0)
+        flags = assessable & ((values < lower) | (values > upper))
+        n_flagged = int(flags.sum())
+
+        if action == "winsorize":
+            self.data[column] = np.where(flags, np.clip(values, lower, upper), values)
+        else:
+            self.data[f"Outlier_{column}"] = flags
+
+        # Relatório de contagens por grupo
+        report_path = self.reports_dir / "outliers_por_grupo.csv"
+        if n_flagged > 0:
+            if group_cols:
+                flagged_rows = self.data.loc[flags, group_cols]
+                counts = flagged_rows.groupby(group_cols, observed=True, dropna=False).size()
+                counts = counts.rename("outliers").reset_index()
+            else:
+                counts = pd.DataFrame([{"outliers": n_flagged}])
+            counts.insert(len(counts.columns) - 1, "metodo", method)
+            counts.to_csv(report_path, index=False)
+            acao = "winsorizados" if action == "winsorize" else "sinalizados"
+            self.validation_messages.append(
+                f"Outliers por grupo ({method.upper()}, limiar {threshold}): {n_flagged} registros {acao}")
+        else:
+            self._discard_outlier_report()
+
+        return True
+
     def generate_statistics(self):
         """Gera estatísticas descritivas"""
         if self.data is None or "Produtividade_t_ha" not in self.data.columns:
@@ -305,6 +1030,200 @@ class AgroAnalysisSystem:
             print(f" Erro ao gerar estatísticas: {e}")
             return False
     
+    def _trend_cells(self, frame):
+        """Soma e contagem de produtividade por série e safra"""
+        series_cols = [c for c in self.config["trend_series"] if c in frame.columns]
+        return (frame.groupby(series_cols + ["Safra"], observed=True, dropna=False)["Produtividade_t_ha"]
+                .agg(soma="sum", n="size"))
+
+    def _skip_trends(self, reason):
+        """Informa por que as tendências não foram calculadas e remove saídas de execuções anteriores"""
+        print(f"Tendências não calculadas: {reason}")
+        for name in ("tendencias.csv", "tendencias_resumo.csv"):
+            path = self.reports_dir / name
+            if path.exists():
+                path.unlink()
+        return True
+
+    @staticmethod
+    def _safra_years(labels):
+        """Ano inicial de cada rótulo de safra ('2023', 2023.0 ou '2023/24'); NaN se não reconhecido"""
+        labels = pd.Series(labels, dtype=object)
+        years = pd.to_numeric(labels, errors="coerce")
+        leading = labels.astype(str).str.extract(r"^\s*(\d{4})(?:\s*[/-]\s*\d{2,4})?\s*$")[0]
+        return years.fillna(pd.to_numeric(leading, errors="coerce")).to_numpy(dtype=float)
+
+    def generate_trends(self, cells=None):
+        """Tendências entre safras por série (variação anual, médias móveis e inclinação linear)"""
+        if cells is None:
+            if self.data is None or "Produtividade_t_ha" not in self.data.columns:
+                print("Dados não disponíveis para análise de tendências")
+                return False
+            if "Safra" not in self.data.columns:
+                return self._skip_trends("coluna Safra ausente")
+            cells = self._trend_cells(self.data)
+
+        trends_path = self.reports_dir / "tendencias.csv"
+        summary_path = self.reports_dir / "tendencias_resumo.csv"
+
+        try:
+            # Rótulos de safra viram o ano inicial; rótulos do mesmo ano são somados
+            labels = cells.index.get_level_values("Safra")
+            years = self._safra_years(labels)
+            unparsed = sorted({str(v) for v, y in zip(labels, years) if np.isnan(y) and not pd.isna(v)})
+            if unparsed:
+                print(f"Valores de Safra não reconhecidos (ignorados): {', '.join(unparsed[:5])}"
+                      f"{' ...' if len(unparsed) > 5 else ''}")
+            keep = ~np.isnan(years)
+            cells = cells[keep]
+            levels = [n for n in cells.index.names if n != "Safra"]
+            cells = cells.groupby([cells.index.get_level_values(n) for n in levels] + [years[keep].astype(int)],
+                                  observed=True, dropna=False).sum()
+            cells.index = cells.index.set_names(levels + ["Safra"])
+
+            # Layout pivotado: uma linha por série, uma coluna por safra
+            means = (cells["soma"] / cells["n"]).unstack("Safra")
+            if means.shape[1] < 2:
+                if unparsed and means.shape[1] == 0:
+                    return self._skip_trends("nenhum valor de Safra pôde ser interpretado como ano")
+                return self._skip_trends("a base tem menos de duas safras")
+
+            years = np.arange(int(means.columns.min()), int(means.columns.max()) + 1)
+            means = means.reindex(columns=years)
+            values = means.to_numpy(dtype=float)
+            n_series, n_years = values.shape
+
+            # Variação relativa em relação à safra anterior
+            yoy = np.full_like(values, np.nan)
+            yoy[:, 1:] = (values[:, 1:] - values[:, :-1]) / values[:, :-1]
+
+            # Janelas móveis (anteriores à safra) sobre todas as séries de uma vez
+            window = max(1, min(int(self.config["trend_window"]), n_years))
+            padded = np.concatenate([np.full((n_series, window - 1), np.nan), values], axis=1)
+            windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+            rolling_mean = np.nanmean(windows, axis=2)
+            rolling_std = np.nanstd(windows, axis=2, ddof=1)
+
+            # Mínimos quadrados por linha, ignorando safras sem dados
+            observed = ~np.isnan(values)
+            x = np.where(observed, years - years[0], 0.0)
+            y = np.where(observed, values, 0.0)
+            n = observed.sum(axis=1)
+            sx, sy = x.sum(axis=1), y.sum(axis=1)
+            sxx, syy, sxy = (x * x).sum(axis=1), (y * y).sum(axis=1), (x * y).sum(axis=1)
+            denom_x = n * sxx - sx ** 2
+            denom_y = n * syy - sy ** 2
+            valid = (n >= 2) & (denom_x > 0)
+            slope = np.where(valid, (n * sxy - sx * sy) / np.where(valid, denom_x, 1), np.nan)
+            r2 = np.where(valid & (denom_y > 0),
+                          (n * sxy - sx * sy) ** 2 / np.where(valid & (denom_y > 0), denom_x * denom_y, 1),
+                          np.nan)
+
+            # Tabela longa (série × safra) apenas com safras observadas
+            keys = means.index.to_frame(index=False)
+            trends = keys.loc[keys.index.repeat(n_years)].reset_index(drop=True)
+            trends["Safra"] = np.tile(years, n_series)
+            trends["media"] = values.ravel()
+            trends["variacao_anual"] = yoy.ravel()
+            trends[f"media_movel_{window}"] = rolling_mean.ravel()
+            trends[f"desvio_movel_{window}"] = rolling_std.ravel()
+            trends["registros"] = cells["n"].unstack("Safra").reindex(columns=years).to_numpy().ravel()
+            trends = trends[observed.ravel()]
+            trends["registros"] = trends["registros"].astype("int64")
+            trends.to_csv(trends_path, index=False)
+
+            first = np.where(observed.any(axis=1), years[np.argmax(observed, axis=1)], np.nan)
+            last = np.where(observed.any(axis=1), years[n_years - 1 - np.argmax(observed[:, ::-1], axis=1)], np.nan)
+            summary = keys.copy()
+            summary["safras"] = n
+            summary["primeira_safra"] = pd.Series(first).astype("Int64")
+            summary["ultima_safra"] = pd.Series(last).astype("Int64")
+            summary["inclinacao_t_ha_safra"] = slope
+            summary["r2"] = r2
+            summary["variacao_anual_media"] = np.nanmean(yoy, axis=1) if n_years > 1 else np.nan
+            summary = summary.sort_values("inclinacao_t_ha_safra", ascending=False, na_position="last")
+            summary.to_csv(summary_path, index=False)
+
+            print(f"Tendências geradas: {n_series} séries × {n_years} safras")
+            return True
+
+        except Exception as e:
+            print(f"Erro ao gerar tendências: {e}")
+            return False
+
+    @staticmethod
+    def _weighted_quantile(values, weights, q):
+        """Quantil ponderado (interpolação sobre os pesos acumulados)"""
+        order = np.argsort(values)
+        values, weights = values[order], weights[order]
+        cumulative = np.cumsum(weights) - 0.5 * weights
+        return float(np.interp(q * weights.sum(), cumulative, values))
+
+    def _stratified_summary(self, frame, strata):
+        """Estimativas ponderadas por estrato e erro-padrão da média estratificada"""
+        values = frame["Produtividade_t_ha"].to_numpy(dtype=float)
+        weights = frame["Peso_Amostral"].to_numpy(dtype=float)
+        population = weights.sum()
+        mean = np.average(values, weights=weights)
+
+        # Var(média) = Σ W_h² (1 - f_h) s_h² / n_h
+        by_stratum = frame.groupby(strata, observed=True, dropna=False).agg(
+            n_h=("Produtividade_t_ha", "size"), s2_h=("Produtividade_t_ha", "var"),
+            peso=("Peso_Amostral", "first"))
+        n_h = by_stratum["n_h"].to_numpy()
+        N_h = n_h * by_stratum["peso"].to_numpy()
+        s2_h = by_stratum["s2_h"].fillna(0).to_numpy()
+        variance = np.sum((N_h / population) ** 2 * (1 - n_h / N_h) * s2_h / n_h)
+
+        return {
+            'n': len(values),
+            'media': mean,
+            'mediana': self._weighted_quantile(values, weights, 0.5),
+            'desvio_padrao': np.sqrt(np.average((values - mean) ** 2, weights=weights)),
+            'minimo': values.min(),
+            'maximo': values.max(),
+            'q1': self._weighted_quantile(values, weights, 0.25),
+            'q3': self._weighted_quantile(values, weights, 0.75),
+            'populacao': int(round(population)),
+            'fracao_amostral': len(values) / population,
+            'erro_padrao_media': np.sqrt(variance)
+        }
+
+    def generate_sample_statistics(self):
+        """Gera as estatísticas descritivas ponderadas a partir da amostra estratificada"""
+        if self.data is None or "Peso_Amostral" not in self.data.columns:
+            print("Amostra não disponível para análise estatística")
+            return False
+
+        try:
+            strata = [c for c in self.config["sample_strata"] if c in self.data.columns]
+            stats_general = self._stratified_summary(self.data, strata)
+            pd.DataFrame([stats_general]).to_csv(self.reports_dir / "estatisticas_geral.csv", index=False)
+            self.sample_info.update(media=stats_general['media'],
+                                    erro_padrao=stats_general['erro_padrao_media'])
+
+            if "Cultura" in self.data.columns:
+                stats_by_culture = []
+                for cultura, frame in self.data.groupby("Cultura", observed=True):
+                    summary = self._stratified_summary(frame, strata)
+                    del summary['q1'], summary['q3']
+                    stats_by_culture.append({'Cultura': cultura, **summary})
+                pd.DataFrame(stats_by_culture).to_csv(self.reports_dir / "estatisticas_por_cultura.csv", index=False)
+
+            print("Estatísticas descritivas geradas (amostra ponderada)")
+            return True
+
+        except Exception as e:
+            print(f" Erro ao gerar estatísticas: {e}")
+            return False
+
+    def _label_sample_chart(self):
+        """Identifica gráficos gerados a partir de amostra"""
+        if self.sample_info:
+            plt.figtext(0.99, 0.005, f"Amostra estratificada: {self.sample_info['amostra']} de "
+                        f"{self.sample_info['populacao']} registros ({self.sample_info['fracao']:.2%})",
+                        ha='right', va='bottom', fontsize=8, color='gray')
+
     def create_visualizations(self):
         """Cria visualizações dos dados"""
         if not MATPLOTLIB_AVAILABLE or not SEABORN_AVAILABLE:
@@ -341,6 +1260,7 @@ class AgroAnalysisSystem:
             plt.ylabel("Densidade")
             plt.legend()
             plt.grid(True, alpha=0.3)
+            self._label_sample_chart()
             plt.tight_layout()
             plt.savefig(self.graphics_dir / "hist_densidade.png", dpi=self.config["chart_dpi"], bbox_inches='tight')
             plt.close()
@@ -353,6 +1273,7 @@ class AgroAnalysisSystem:
                 plt.xlabel("Cultura")
                 plt.ylabel("Produtividade (t/ha)")
                 plt.grid(True, alpha=0.3)
+                self._label_sample_chart()
                 plt.tight_layout()
                 plt.savefig(self.graphics_dir / "boxplot_cultura.png", dpi=self.config["chart_dpi"], bbox_inches='tight')
                 plt.close()
@@ -373,6 +1294,7 @@ class AgroAnalysisSystem:
                             f'{prop:.1%}', ha='center', va='bottom', fontweight='bold')
                 
                 plt.grid(True, alpha=0.3, axis='y')
+                self._label_sample_chart()
                 plt.tight_layout()
                 plt.savefig(self.graphics_dir / "frequencias_cultura.png", dpi=self.config["chart_dpi"], bbox_inches='tight')
                 plt.close()
@@ -398,6 +1320,7 @@ class AgroAnalysisSystem:
                                 f'{bar.get_height():.2f}', ha='center', va='bottom', fontweight='bold')
                     
                     plt.grid(True, alpha=0.3, axis='y')
+                    self._label_sample_chart()
                     plt.tight_layout()
                     plt.savefig(self.graphics_dir / "feijao_subtipos.png", dpi=self.config["chart_dpi"], bbox_inches='tight')
                     plt.close()
@@ -408,7 +1331,126 @@ class AgroAnalysisSystem:
         except Exception as e:
             print(f"Erro ao criar visualizações: {e}")
             return False
-    
+
+    def _create_all_visualizations(self):
+        """Gráficos globais e, se configurado, os painéis por região e safra"""
+        self.panels_rendered = False
+        if not self.create_visualizations():
+            return False
+        if self.config.get("facet_panels"):
+            self.panels_rendered = self.create_small_multiples()
+        return True
+
+    def create_small_multiples(self, row_col="Regiao", col_col="Safra", box_col="Cultura"):
+        """Gera painéis de produtividade por Região × Safra e uma galeria HTML"""
+        if not MATPLOTLIB_AVAILABLE:
+            print(" matplotlib não disponível para os painéis")
+            return False
+
+        column = "Produtividade_t_ha"
+        needed = [row_col, col_col, box_col, column]
+        if self.data is None or any(c not in self.data.columns for c in needed):
+            print(" Dados não disponíveis para os painéis por região e safra")
+            return False
+
+        try:
+            started = time.perf_counter()
+            panels_dir = self.graphics_dir / "paineis"
+            panels_dir.mkdir(parents=True, exist_ok=True)
+
+            # Pré-agregação única: quartis e extremos por painel e cultura
+            grouped = self.data.groupby([row_col, col_col, box_col], observed=True, sort=True)[column]
+            stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+            stats = stats.join(grouped.agg(["size", "min", "max"]))
+            stats.columns = ["q1", "med", "q3", "n", "min", "max"]
+            iqr = stats["q3"] - stats["q1"]
+            stats["whislo"] = np.maximum(stats["min"], stats["q1"] - 1.5 * iqr)
+            stats["whishi"] = np.minimum(stats["max"], stats["q3"] + 1.5 * iqr)
+
+            panels = []
+            for (row_value, col_value), frame in stats.groupby(level=[0, 1], sort=True):
+                slug = re.sub(r"[^a-z0-9]+", "_", self._fold_category(f"{row_value}_{col_value}")).strip("_")
+                boxes = [{"label": f"{idx[2]}\n(n={int(r.n)})", "q1": r.q1, "med": r.med, "q3": r.q3,
+                          "whislo": r.whislo, "whishi": r.whishi, "fliers": []}
+                         for idx, r in zip(frame.index, frame.itertuples(index=False))]
+                panels.append({"row": row_value, "col": col_value, "file": f"painel_{slug}.png",
+                               "title": f"{row_value} — Safra {col_value}", "boxes": boxes})
+
+            if not panels:
+                print(" Nenhum painel a gerar")
+                return False
+
+            # Escala comum a todos os painéis para permitir comparação visual
+            margin = 0.05 * (stats["max"].max() - stats["min"].min() or 1)
+            ylim = (max(stats["min"].min() - margin, 0), stats["max"].max() + margin)
+            args = (str(panels_dir), tuple(self.config["facet_size"]), self.config["facet_dpi"], ylim)
+
+            workers = self.config.get("facet_workers") or min(os.cpu_count() or 1, 8)
+            if workers > 1 and len(panels) >= 4 * workers:
+                batch_size = -(-len(panels) // (workers * 4))
+                batches = [panels[i:i + batch_size] for i in range(0, len(panels), batch_size)]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_render_panel_batch, batch, *args) for batch in batches]
+                    rendered = sum(f.result() for f in futures)
+            else:
+                rendered = _render_panel_batch(panels, *args)
+
+            self._write_panel_gallery(panels, panels_dir, row_col, col_col)
+
+            elapsed = time.perf_counter() - started
+            print(f"Painéis gerados: {rendered} em {elapsed:.1f}s ({rendered / max(elapsed, 1e-9):.0f} painéis/s)")
+            return True
+
+        except Exception as e:
+            print(f"Erro ao criar painéis: {e}")
+            return False
+
+    def _write_panel_gallery(self, panels, panels_dir, row_col, col_col):
+        """Galeria HTML com os painéis organizados em linhas (região) e colunas (safra)"""
+        rows = list(dict.fromkeys(p["row"] for p in panels))
+        cols = sorted(dict.fromkeys(p["col"] for p in panels))
+        by_key = {(p["row"], p["col"]): p for p in panels}
+
+        cells = []
+        for row_value in rows:
+            cells.append(f"<tr><th>{html.escape(str(row_value))}</th>")
+            for col_value in cols:
+                panel = by_key.get((row_value, col_value))
+                if panel:
+                    title = html.escape(panel["title"])
+                    cells.append(f'<td><a href="{panel["file"]}"><img src="{panel["file"]}" '
+                                 f'alt="{title}" title="{title}" loading="lazy"></a></td>')
+                else:
+                    cells.append("<td></td>")
+            cells.append("</tr>\n")
+
+        header = "".join(f"<th>{html.escape(str(c))}</th>" for c in cols)
+        gallery = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <title>Painéis de Produtividade — {html.escape(row_col)} × {html.escape(col_col)}</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 20px; }}
+        table {{ border-collapse: collapse; }}
+        th {{ background-color: #4CAF50; color: white; padding: 6px; position: sticky; top: 0; }}
+        td {{ padding: 4px; border: 1px solid #ddd; }}
+        img {{ width: 240px; height: auto; }}
+    </style>
+</head>
+<body>
+    <h1>Painéis de Produtividade — {html.escape(row_col)} × {html.escape(col_col)}</h1>
+    <p>{len(panels)} painéis · escala vertical comum a todos os painéis</p>
+    <table>
+        <tr><th></th>{header}</tr>
+        {"".join(cells)}
+    </table>
+</body>
+</html>
+"""
+        with open(panels_dir / "index.html", "w", encoding="utf-8") as f:
+            f.write(gallery)
+
     def run_r_analysis(self):
         """Executa análise R se disponível"""
         if not self.check_r_installation():
@@ -440,7 +1482,188 @@ class AgroAnalysisSystem:
         except Exception as e:
             print(f"Erro ao executar R: {e}")
             return False
-    
+
+    @staticmethod
+    def _r_mean(values):
+        """Média com o refinamento em duas passagens usado por mean() no R"""
+        mean = values.sum() / len(values)
+        return mean + (values - mean).sum() / len(values)
+
+    @staticmethod
+    def _e1071_skewness(values):
+        """Assimetria como e1071::skewness (type = 3)"""
+        n = len(values)
+        if n == 0:
+            return np.nan
+        dev = values - values.mean()
+        m2 = np.mean(dev ** 2)
+        m3 = np.mean(dev ** 3)
+        return m3 / m2 ** 1.5 * (1 - 1 / n) ** 1.5
+
+    @staticmethod
+    def _e1071_kurtosis(values):
+        """Curtose (excesso) como e1071::kurtosis (type = 3)"""
+        n = len(values)
+        if n == 0:
+            return np.nan
+        dev = values - values.mean()
+        m2 = np.mean(dev ** 2)
+        m4 = np.mean(dev ** 4)
+        return m4 / m2 ** 2 * (1 - 1 / n) ** 2 - 3
+
+    @staticmethod
+    def _density_nrd0(values, points=512):
+        """Densidade gaussiana com largura de banda bw.nrd0 (padrão do geom_density)"""
+        n = len(values)
+        sd = values.std(ddof=1) if n > 1 else 0.0
+        iqr = np.subtract(*np.percentile(values, [75, 25]))
+        lo = min(sd, iqr / 1.34) if iqr > 0 else sd
+        if not lo > 0:
+            lo = abs(values[0]) if values[0] != 0 else 1.0
+        bw = 0.9 * lo * n ** -0.2
+
+        grid = np.linspace(values.min(), values.max(), points)
+        # Bases grandes: agrega em bins antes de somar os núcleos
+        if n > 10000:
+            weights, edges = np.histogram(values, bins=2048)
+            centers = (edges[:-1] + edges[1:]) / 2
+        else:
+            weights, centers = np.ones(n), values
+        z = (grid[:, None] - centers[None, :]) / bw
+        density = (np.exp(-0.5 * z ** 2) * weights).sum(axis=1) / (n * bw * np.sqrt(2 * np.pi))
+        return grid, density
+
+    def run_native_r_analysis(self):
+        """Gera em Python as mesmas saídas do script R (sem subprocesso)"""
+        source = self.raw_data if self.raw_data is not None else self.data
+        if source is None:
+            print("Dados não disponíveis para a análise R nativa")
+            return False
+
+        expected = ["Safra", "Regiao", "Cultura", "Subtipo", "Produtividade_t_ha", "Nivel_Tecnologico"]
+        missing = [col for col in expected if col not in source.columns]
+        if missing:
+            print(f"Colunas faltando na base: {', '.join(missing)}")
+            return False
+
+        output_dir = Path(self.config["r_output_dir"])
+        graphics_dir = output_dir / "graficos"
+        graphics_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            print("Executando análise R nativa (Python)...")
+            prod = pd.to_numeric(source["Produtividade_t_ha"], errors="coerce")
+
+            # Regras de validação do script R (avaliadas antes da limpeza)
+            messages = []
+            if prod.isna().any():
+                messages.append("Há valores NA em Produtividade_t_ha — serão removidos.")
+            if ((prod < 0) | (prod > 20)).any():
+                messages.append("Há produtividades fora do intervalo [0,20] t/ha — serão capadas.")
+            if messages:
+                with open(output_dir / "validacao.log", "w", encoding="utf-8") as f:
+                    f.write("\n".join(messages) + "\n")
+
+            # Limpeza: capar em [0, 20], Cultura como fator Arroz/Feijão, remover NA
+            keep = prod.notna().to_numpy()
+            values = prod.to_numpy(dtype=float)[keep].clip(0, 20)
+            cultura = source["Cultura"].to_numpy()[keep]
+            cultura = pd.Categorical(np.where(np.isin(cultura, R_CULTURE_LEVELS), cultura, None),
+                                     categories=R_CULTURE_LEVELS)
+            subtipo = source["Subtipo"].to_numpy()[keep]
+
+            desc_geral = pd.DataFrame([{
+                "n": len(values),
+                "media": self._r_mean(values),
+                "mediana": np.median(values),
+                "dp": values.std(ddof=1),
+                "minimo": values.min(),
+                "maximo": values.max(),
+                "assimetria": self._e1071_skewness(values),
+                "curtose": self._e1071_kurtosis(values),
+            }])
+
+            # group_by(Cultura): níveis na ordem do fator e NA por último
+            codes = cultura.codes.astype(np.int64)
+            codes[codes < 0] = len(R_CULTURE_LEVELS)
+            labels = R_CULTURE_LEVELS + ["NA"]
+            grouped = pd.Series(values).groupby(codes, sort=True)
+            desc_por_cultura = grouped.agg(["size", "mean", "median", "std", "min", "max"])
+            desc_por_cultura.columns = ["n", "media", "mediana", "dp", "minimo", "maximo"]
+            desc_por_cultura.insert(0, "Cultura", [labels[c] for c in desc_por_cultura.index])
+
+            desc_geral.to_csv(output_dir / "estatisticas_geral.csv", index=False, na_rep="NA")
+            desc_por_cultura.to_csv(output_dir / "estatisticas_por_cultura.csv", index=False, na_rep="NA")
+
+            if MATPLOTLIB_AVAILABLE:
+                group_labels = [labels[c] for c in desc_por_cultura.index]
+                self._save_native_r_charts(values, codes, group_labels, desc_por_cultura,
+                                           cultura, subtipo, graphics_dir)
+
+            print(f"Análise R nativa concluída: {output_dir}")
+            return True
+
+        except Exception as e:
+            print(f"Erro na análise R nativa: {e}")
+            return False
+
+    def _save_native_r_charts(self, values, codes, group_labels, desc_por_cultura,
+                              cultura, subtipo, graphics_dir):
+        """Gráficos equivalentes aos ggplots do script R (8x5 pol., 120 dpi)"""
+        fig, ax = plt.subplots(figsize=(8, 5))
+
+        # p1: histograma + densidade
+        ax.hist(values, bins=12, density=True, color="#595959")
+        grid, density = self._density_nrd0(values)
+        ax.plot(grid, density, color="black", linewidth=1.5)
+        ax.set(title="Produtividade (t/ha) — Histograma e Densidade", xlabel="t/ha", ylabel="Densidade")
+        fig.savefig(graphics_dir / "hist_densidade.png", dpi=120)
+
+        # p2: boxplot por cultura
+        ax.clear()
+        ax.boxplot([values[codes == c] for c in desc_por_cultura.index])
+        ax.set_xticks(range(1, len(group_labels) + 1), group_labels)
+        ax.set(title="Produtividade por Cultura", xlabel="Cultura", ylabel="t/ha")
+        fig.savefig(graphics_dir / "boxplot_cultura.png", dpi=120)
+
+        # p3: frequências com proporções
+        ax.clear()
+        counts = desc_por_cultura["n"].to_numpy()
+        bars = ax.bar(group_labels, counts, color="#595959")
+        for bar, prop in zip(bars, counts / counts.sum()):
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f"{prop:.1%}",
+                    ha="center", va="bottom")
+        ax.set(title="Frequências e Proporções por Cultura", xlabel="Cultura", ylabel="Contagem")
+        fig.savefig(graphics_dir / "frequencias_cultura.png", dpi=120)
+
+        # p4: feijão por subtipo (média)
+        ax.clear()
+        mask = (np.asarray(cultura) == "Feijão") & pd.notna(subtipo)
+        if mask.any():
+            means = pd.Series(values[mask]).groupby(subtipo[mask]).mean()
+            ax.bar(means.index.astype(str), means.to_numpy(), color="#595959")
+            ax.set(title="Feijão — Produtividade média por subtipo (CONAB)", xlabel="Subtipo", ylabel="t/ha")
+        else:
+            ax.set_title("Sem dados de subtipos de Feijão disponíveis")
+        fig.savefig(graphics_dir / "feijao_subtipos.png", dpi=120)
+
+        plt.close(fig)
+
+    def compare_r_outputs(self, reference_dir, rtol=1e-9):
+        """Compara as tabelas nativas com as geradas pelo Rscript"""
+        output_dir = Path(self.config["r_output_dir"])
+        ok = True
+        for name in ["estatisticas_geral.csv", "estatisticas_por_cultura.csv"]:
+            try:
+                native = pd.read_csv(output_dir / name)
+                reference = pd.read_csv(Path(reference_dir) / name)
+                pd.testing.assert_frame_equal(native, reference, check_dtype=False, rtol=rtol)
+                print(f"Paridade OK: {name}")
+            except (AssertionError, FileNotFoundError) as e:
+                print(f"Divergência em {name}: {e}")
+                ok = False
+        return ok
+
     def generate_report(self):
         """Gera relatório HTML"""
         try:
@@ -482,7 +1705,22 @@ class AgroAnalysisSystem:
         <h2>Visão Geral</h2>
         <p>Este relatório apresenta análise de dados do agronegócio brasileiro, incluindo validação de dados, 
         estatísticas descritivas e visualizações de produtividade agrícola.</p>
-        
+"""
+            
+            if self.sample_info:
+                info = self.sample_info
+                html_content += f"""
+        <div class="info">
+            <h3>Prévia por Amostragem Estratificada</h3>
+            <p>Resultados calculados sobre <strong>{info['amostra']}</strong> de <strong>{info['populacao']}</strong>
+            registros (fração amostral <strong>{info['fracao']:.2%}</strong>), com até {info['por_estrato']} registros
+            por estrato ({', '.join(info['estratos'])}; {info['n_estratos']} estratos).</p>
+            <p>Média estimada: {info['media']:.3f} t/ha ± {1.96 * info['erro_padrao']:.3f} (IC 95%).
+            Estatísticas ponderadas pelo inverso da fração amostral de cada estrato; gráficos usam a amostra sem ponderação.</p>
+        </div>
+"""
+            
+            html_content += """
         <h2>📈 Estatísticas Descritivas</h2>
 """
             
@@ -502,7 +1740,29 @@ class AgroAnalysisSystem:
                 html_content += "<h3>Estatísticas por Cultura</h3>\n"
                 html_content += stats_by_culture_df.to_html(index=False, classes='stats-table')
                 html_content += "</div>\n"
-            
+
+            trends_file = self.reports_dir / "tendencias_resumo.csv"
+            if trends_file.exists():
+                trends_df = pd.read_csv(trends_file)
+                html_content += "<div class='stats'>\n"
+                html_content += "<h3>Tendências entre Safras</h3>\n"
+                html_content += (f"<p>{len(trends_df)} séries analisadas; inclinação linear em t/ha por safra. "
+                                 f"Tabela completa em tendencias.csv.</p>\n")
+                html_content += "<h4>Maiores altas</h4>\n"
+                html_content += trends_df.head(5).to_html(index=False, classes='stats-table', float_format='%.3f')
+                html_content += "<h4>Maiores quedas</h4>\n"
+                html_content += (trends_df.dropna(subset=["inclinacao_t_ha_safra"]).tail(5).iloc[::-1]
+                                 .to_html(index=False, classes='stats-table', float_format='%.3f'))
+                html_content += "</div>\n"
+
+            outliers_file = self.reports_dir / "outliers_por_grupo.csv"
+            if outliers_file.exists():
+                outliers_df = pd.read_csv(outliers_file)
+                html_content += "<div class='stats'>\n"
+                html_content += "<h3>Outliers por Grupo</h3>\n"
+                html_content += outliers_df.to_html(index=False, classes='stats-table')
+                html_content += "</div>\n"
+
             html_content += """
         <h2>Visualizações</h2>
         <p>Os gráficos abaixo mostram diferentes aspectos da produtividade agrícola:</p>
@@ -524,6 +1784,13 @@ class AgroAnalysisSystem:
         <img src="graficos/{graphic_file}" alt="{title}">
 """
             
+            gallery_path = self.graphics_dir / "paineis" / "index.html"
+            if self.panels_rendered and gallery_path.exists():
+                html_content += """
+        <h3>Painéis por Região e Safra</h3>
+        <p><a href="graficos/paineis/index.html">Abrir galeria de painéis</a></p>
+"""
+            
             # Adicionar mensagens de validação se houver
             if self.validation_messages:
                 html_content += """
@@ -560,6 +1827,18 @@ class AgroAnalysisSystem:
         """Executa análise rápida"""
         print("Iniciando análise rápida...")
         
+        # Com orçamento de memória, bases grandes seguem o caminho em blocos
+        if self.config.get("max_memory_mb"):
+            try:
+                strategy = self.choose_execution_strategy()
+            except Exception as e:
+                print(f"Erro ao estimar o uso de memória: {e}")
+                return False
+            if strategy["estrategia"] == "insuficiente":
+                return False
+            if strategy["estrategia"] == "blocos":
+                return self.run_out_of_core_analysis(strategy["linhas_por_bloco"])
+        
         if not self.load_data():
             return False
         
@@ -569,7 +1848,10 @@ class AgroAnalysisSystem:
         if not self.generate_statistics():
             return False
         
-        if not self.create_visualizations():
+        if not self.generate_trends():
+            return False
+        
+        if not self._create_all_visualizations():
             return False
         
         if not self.generate_report():
@@ -577,7 +1859,318 @@ class AgroAnalysisSystem:
         
         print("Análise rápida concluída!")
         return True
-    
+
+    def run_out_of_core_analysis(self, chunk_rows, file_path=None):
+        """Executa carga, validação e estatísticas em blocos, sem manter a base em memória"""
+
+        self.data = None
+        self.raw_data = None
+        self.validation_messages = []
+        self._discard_outlier_report()
+        column = "Produtividade_t_ha"
+
+        summary = StreamingSummary()
+        subtype_sums = {}
+        trend_cells = None
+        remappings = {}
+        category_lookups = {}
+        total_rows = na_count = invalid_count = chunks = 0
+
+        try:
+            for chunk in self._iter_data_chunks(chunk_rows, file_path):
+                if chunks == 0:
+                    missing_columns = [c for c in EXPECTED_COLUMNS if c not in chunk.columns]
+                    if missing_columns:
+                        self.validation_messages.append(f"Colunas faltando: {', '.join(missing_columns)}")
+                    if column not in chunk.columns:
+                        print("Dados não disponíveis para análise estatística")
+                        return False
+                chunks += 1
+                total_rows += len(chunk)
+
+                values = pd.to_numeric(chunk[column], errors="coerce")
+                na_count += int(values.isna().sum())
+                invalid_count += int(((values < 0) | (values > 20)).sum())
+
+                chunk = chunk[values.notna()].copy()
+                chunk[column] = values[values.notna()].clip(0, 20)
+                for r in self._normalize_frame_categories(chunk, category_lookups):
+                    key = (r["coluna"], r["original"], r["normalizado"])
+                    remappings[key] = remappings.get(key, 0) + r["registros"]
+
+                if "Safra" in chunk.columns:
+                    # Acumulador único de soma/contagem por série e safra: tamanho
+                    # limitado pelo número de células, não pelo número de blocos
+                    cells = self._trend_cells(chunk)
+                    if trend_cells is not None:
+                        cells = pd.concat([trend_cells, cells]).groupby(
+                            level=list(range(cells.index.nlevels)), observed=True, dropna=False, sort=False).sum()
+                    trend_cells = cells
+
+                prod = chunk[column].to_numpy(dtype=float)
+                summary.update(np.full(len(prod), "__geral__", dtype=object), prod)
+                if "Cultura" in chunk.columns:
+                    cultura = chunk["Cultura"].astype(object).to_numpy()
+                    summary.update(cultura, prod)
+                    if "Subtipo" in chunk.columns:
+                        feijao = chunk[(cultura == "Feijão") & chunk["Subtipo"].notna().to_numpy()]
+                        sums = feijao.groupby(feijao["Subtipo"].astype(object))[column].agg(["sum", "size"])
+                        for subtipo, row in sums.iterrows():
+                            acc = subtype_sums.setdefault(subtipo, [0.0, 0])
+                            acc[0] += row["sum"]
+                            acc[1] += int(row["size"])
+
+        except FileNotFoundError as e:
+            print(f"Arquivo não encontrado: {e.filename or e}")
+            return False
+        except Exception as e:
+            print(f"Erro na leitura em blocos: {e}")
+            return False
+
+        print(f"Dados processados em {chunks} blocos: {total_rows} registros")
+
+        if na_count > 0:
+            self.validation_messages.append(f"Valores NA em Produtividade_t_ha: {na_count}")
+        if invalid_count > 0:
+            self.validation_messages.append(f"Produtividades fora do intervalo [0,20]: {invalid_count} registros")
+        self._report_category_remappings([
+            {"coluna": c, "original": o, "normalizado": n, "registros": count}
+            for (c, o, n), count in remappings.items()
+        ])
+        self.validation_messages.append(
+            f"Execução out-of-core: {chunks} blocos de até {chunk_rows} linhas "
+            f"(orçamento {self.config['max_memory_mb']:.0f} MB); medianas e quartis aproximados "
+            f"por histograma; detecção de outliers por grupo não executada")
+
+        if "__geral__" not in summary.groups:
+            print("Nenhum registro válido após a validação")
+            return False
+
+        # Estatísticas nos mesmos arquivos do caminho em memória
+        pd.DataFrame([summary.summary("__geral__")]).to_csv(
+            self.reports_dir / "estatisticas_geral.csv", index=False)
+        cultures = [label for label in summary.groups if label != "__geral__"]
+        if cultures:
+            stats_by_culture = [dict(Cultura=label, **{k: v for k, v in summary.summary(label).items()
+                                                       if k not in ("q1", "q3")})
+                                for label in cultures]
+            pd.DataFrame(stats_by_culture).to_csv(self.reports_dir / "estatisticas_por_cultura.csv", index=False)
+        print("Estatísticas descritivas geradas (em blocos)")
+
+        if trend_cells is not None:
+            if not self.generate_trends(trend_cells):
+                return False
+        else:
+            self._skip_trends("coluna Safra ausente")
+
+        self.panels_rendered = False
+        if self.config.get("facet_panels"):
+            print("Painéis por Região × Safra não gerados na execução em blocos (exigem a base em memória)")
+        if not self._create_visualizations_from_summary(summary, cultures, subtype_sums):
+            return False
+        if not self.generate_report():
+            return False
+
+        print(f"Pico de memória: {self._peak_rss_mb():.0f} MB (orçamento {self.config['max_memory_mb']:.0f} MB)")
+        print("Análise rápida concluída!")
+        return True
+
+    def _create_visualizations_from_summary(self, summary, cultures, subtype_sums):
+        """Gera os gráficos da análise rápida a partir dos agregados do modo em blocos"""
+        if not MATPLOTLIB_AVAILABLE:
+            print(" matplotlib não disponível para visualização")
+            return False
+
+        try:
+            fig, ax = plt.subplots(figsize=self.config["chart_size"])
+            dpi = self.config["chart_dpi"]
+
+            # 1. Histograma (12 bins reagrupados a partir do histograma fino)
+            state = summary.groups["__geral__"]
+            edges = np.linspace(state["min"], state["max"], 13)
+            fine_centers = (summary.edges[:-1] + summary.edges[1:]) / 2
+            counts, _ = np.histogram(fine_centers, bins=edges, weights=state["hist"])
+            widths = np.diff(edges)
+            ax.bar(edges[:-1], counts / (counts.sum() * widths), width=widths, align='edge',
+                   alpha=0.7, color='skyblue', edgecolor='black')
+            ax.set_title("Produtividade (t/ha) — Histograma e Densidade", fontsize=14, fontweight='bold')
+            ax.set_xlabel("Produtividade (t/ha)")
+            ax.set_ylabel("Densidade")
+            ax.grid(True, alpha=0.3)
+            fig.savefig(self.graphics_dir / "hist_densidade.png", dpi=dpi)
+
+            if cultures:
+                # 2. Boxplot a partir dos quartis aproximados
+                ax.clear()
+                boxes = []
+                for label in cultures:
+                    q1, med, q3 = (summary.quantile(label, q) for q in (0.25, 0.5, 0.75))
+                    group = summary.groups[label]
+                    boxes.append({"label": label, "q1": q1, "med": med, "q3": q3, "fliers": [],
+                                  "whislo": max(group["min"], q1 - 1.5 * (q3 - q1)),
+                                  "whishi": min(group["max"], q3 + 1.5 * (q3 - q1))})
+                ax.bxp(boxes)
+                ax.set_title("Produtividade por Cultura", fontsize=14, fontweight='bold')
+                ax.set_xlabel("Cultura")
+                ax.set_ylabel("Produtividade (t/ha)")
+                ax.grid(True, alpha=0.3)
+                fig.savefig(self.graphics_dir / "boxplot_cultura.png", dpi=dpi)
+
+                # 3. Frequências por cultura
+                ax.clear()
+                counts = np.array([summary.groups[label]["n"] for label in cultures])
+                bars = ax.bar([str(label) for label in cultures], counts, color=['lightcoral', 'lightgreen'])
+                for bar, prop in zip(bars, counts / counts.sum()):
+                    ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
+                            f'{prop:.1%}', ha='center', va='bottom', fontweight='bold')
+                ax.set_title("Frequências e Proporções por Cultura", fontsize=14, fontweight='bold')
+                ax.set_xlabel("Cultura")
+                ax.set_ylabel("Contagem")
+                ax.grid(True, alpha=0.3, axis='y')
+                fig.savefig(self.graphics_dir / "frequencias_cultura.png", dpi=dpi)
+
+            # 4. Subtipos de feijão
+            if subtype_sums:
+                ax.clear()
+                subtypes = sorted(subtype_sums)
+                means = [subtype_sums[s][0] / subtype_sums[s][1] for s in subtypes]
+                bars = ax.bar([str(s) for s in subtypes], means, color=['gold', 'orange', 'darkorange'])
+                for bar in bars:
+                    ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.05,
+                            f'{bar.get_height():.2f}', ha='center', va='bottom', fontweight='bold')
+                ax.set_title("Feijão — Produtividade média por subtipo", fontsize=14, fontweight='bold')
+                ax.set_xlabel("Subtipo")
+                ax.set_ylabel("Produtividade média (t/ha)")
+                ax.grid(True, alpha=0.3, axis='y')
+                fig.savefig(self.graphics_dir / "feijao_subtipos.png", dpi=dpi)
+
+            plt.close(fig)
+            print("Visualizações geradas (a partir dos agregados)")
+            return True
+
+        except Exception as e:
+            print(f"Erro ao criar visualizações: {e}")
+            return False
+
+    def draw_stratified_sample(self, per_stratum, file_path=None):
+        """Amostra estratificada em uma única passada: reservatório de tamanho fixo por estrato"""
+
+        column = "Produtividade_t_ha"
+        rng = np.random.default_rng(self.config.get("sample_seed"))
+        reservoir = None
+        stratum_ids = {}
+        population = np.zeros(0, dtype=np.int64)
+        remappings = {}
+        category_lookups = {}
+        messages = []
+        total_rows = na_count = invalid_count = 0
+
+        for chunk in self._iter_data_chunks(self.config["sample_chunk_rows"], file_path):
+            if column not in chunk.columns:
+                raise ValueError(f"Coluna {column} não encontrada na base")
+            strata = [c for c in self.config["sample_strata"] if c in chunk.columns]
+            total_rows += len(chunk)
+
+            values = pd.to_numeric(chunk[column], errors="coerce")
+            na_count += int(values.isna().sum())
+            invalid_count += int(((values < 0) | (values > 20)).sum())
+            chunk = chunk[values.notna()].copy()
+            chunk[column] = values[values.notna()].clip(0, 20)
+
+            # Estratos definidos após a normalização das grafias
+            for r in self._normalize_frame_categories(chunk, category_lookups):
+                key = (r["coluna"], r["original"], r["normalizado"])
+                remappings[key] = remappings.get(key, 0) + r["registros"]
+
+            # Um único agrupamento por bloco; os estratos recebem ids inteiros globais
+            grouped = chunk.groupby(strata, dropna=False, sort=False, observed=True)
+            local_ids = grouped.ngroup().to_numpy()
+            keys = grouped.size().index
+            keys = keys if isinstance(keys, pd.MultiIndex) else [(k,) for k in keys]
+            keys = [tuple(None if pd.isna(v) else v for v in k) for k in keys]
+            global_of_local = np.array([stratum_ids.setdefault(k, len(stratum_ids)) for k in keys],
+                                       dtype=np.int64)
+            chunk["_estrato"] = global_of_local[local_ids]
+            counts = np.bincount(chunk["_estrato"].to_numpy(), minlength=len(stratum_ids))
+            population = np.pad(population, (0, len(counts) - len(population))) + counts
+
+            # Reservatório por chave aleatória: manter as k menores chaves de cada
+            # estrato equivale a uma amostra aleatória simples de k registros
+            chunk["_chave"] = rng.random(len(chunk))
+            combined = chunk if reservoir is None else pd.concat([reservoir, chunk], ignore_index=True)
+            combined = combined.sort_values("_chave", kind="stable")
+            reservoir = combined[combined.groupby("_estrato").cumcount().to_numpy() < per_stratum]
+
+        if reservoir is None or len(reservoir) == 0:
+            raise ValueError("Nenhum registro válido para amostragem")
+
+        strata = [c for c in self.config["sample_strata"] if c in reservoir.columns]
+        ids = reservoir["_estrato"].to_numpy()
+        sample_sizes = np.bincount(ids, minlength=len(population))
+        sample = reservoir.drop(columns=["_chave", "_estrato"]).reset_index(drop=True)
+        sample["Peso_Amostral"] = population[ids] / sample_sizes[ids]
+
+        if na_count > 0:
+            messages.append(f"Valores NA em Produtividade_t_ha: {na_count}")
+        if invalid_count > 0:
+            messages.append(f"Produtividades fora do intervalo [0,20]: {invalid_count} registros")
+
+        valid_rows = int(population.sum())
+        self.sample_info = {
+            "populacao": valid_rows,
+            "lidos": total_rows,
+            "amostra": len(sample),
+            "fracao": len(sample) / valid_rows,
+            "por_estrato": per_stratum,
+            "estratos": strata,
+            "n_estratos": int((sample_sizes > 0).sum()),
+        }
+        remap_list = [{"coluna": c, "original": o, "normalizado": n, "registros": count}
+                      for (c, o, n), count in remappings.items()]
+        return sample, messages, remap_list
+
+    def run_sample_analysis(self, per_stratum):
+        """Prévia rápida: estatísticas, gráficos e relatório a partir de amostra estratificada"""
+        print("Iniciando prévia por amostragem estratificada...")
+        started = time.perf_counter()
+
+        try:
+            sample, messages, remappings = self.draw_stratified_sample(per_stratum)
+        except FileNotFoundError as e:
+            print(f"Arquivo não encontrado: {e.filename or e}")
+            return False
+        except Exception as e:
+            print(f"Erro na amostragem: {e}")
+            return False
+
+        info = self.sample_info
+        print(f"Amostra: {info['amostra']} de {info['populacao']} registros válidos "
+              f"({info['fracao']:.2%}) em {info['n_estratos']} estratos")
+
+        self.data = sample
+        self.raw_data = sample
+        if not self.validate_data():
+            return False
+        self._report_category_remappings(remappings)
+        self.validation_messages = messages + self.validation_messages + [
+            f"Prévia por amostragem: {info['amostra']} de {info['populacao']} registros "
+            f"({info['fracao']:.2%}), até {per_stratum} por estrato"]
+
+        if not self.generate_sample_statistics():
+            return False
+        print(f"Média estimada: {info['media']:.3f} t/ha ± {1.96 * info['erro_padrao']:.3f} (IC 95%)")
+
+        if not self.generate_trends():
+            return False
+
+        if not self._create_all_visualizations():
+            return False
+        if not self.generate_report():
+            return False
+
+        print(f"Prévia concluída em {time.perf_counter() - started:.1f}s")
+        return True
+
     def run_complete_analysis(self):
         """Executa análise completa (Python + R)"""
         print("Iniciando análise completa...")
@@ -586,12 +2179,150 @@ class AgroAnalysisSystem:
         if not self.run_quick_analysis():
             return False
         
-        # Análise R
-        self.run_r_analysis()
+        # Análise R (nativa em Python ou via Rscript)
+        self._run_r_backend()
         
         print("Análise completa concluída!")
         return True
-    
+
+    def _run_r_backend(self):
+        """Gera as saídas do script R pelo backend configurado"""
+        if self.config.get("r_backend") == "rscript":
+            return self.run_r_analysis()
+        if self.execution_strategy and self.execution_strategy["estrategia"] == "blocos":
+            print("Análise R nativa requer a base em memória; use --backend-r rscript ou aumente --max-memory")
+            return False
+        return self.run_native_r_analysis()
+
+    @staticmethod
+    def _file_signature(path):
+        """Assinatura (mtime, tamanho) de um arquivo monitorado"""
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except (OSError, TypeError):
+            return None
+
+    def _stages_for_config_change(self, old_config):
+        """Determina a primeira etapa afetada pelas chaves alteradas na configuração"""
+        changed = {k for k in set(old_config) | set(self.config)
+                   if old_config.get(k) != self.config.get(k)}
+        if not changed:
+            return None
+        if changed & {"data_file", "data_sources", "source_column", "max_memory_mb"}:
+            return "load"
+        if any(k.startswith(WATCH_VALIDATION_KEYS) for k in changed):
+            return "validate"
+        if any(k.startswith(WATCH_TREND_KEYS) for k in changed):
+            return "trends"
+        if any(k.startswith(WATCH_CHART_KEYS) for k in changed):
+            return "charts"
+        return "report"
+
+    def _run_from_stage(self, stage, mode="rapido"):
+        """Reexecuta o pipeline a partir da etapa indicada, reaproveitando o estado carregado"""
+        stages = ["load", "validate", "stats", "trends", "charts", "report"]
+        if stage == "validate" and self.raw_data is None:
+            stage = "load"
+
+        # Com orçamento de memória a estratégia é reavaliada a cada recarga; na execução
+        # em blocos não há base em memória e o pipeline é refeito por inteiro
+        strategy = (self.execution_strategy or {}).get("estrategia")
+        if self.config.get("max_memory_mb") and (stage == "load" or strategy != "memoria"):
+            success = self.run_quick_analysis()
+            if success and mode == "completo":
+                self._run_r_backend()
+            return success
+
+        steps = {
+            "load": self.load_data,
+            "validate": self._revalidate,
+            "stats": self.generate_statistics,
+            "trends": self.generate_trends,
+            "charts": self._create_all_visualizations,
+            "report": self.generate_report,
+        }
+        for name in stages[stages.index(stage):]:
+            if not steps[name]():
+                return False
+
+        if mode == "completo" and stage in ("load", "validate"):
+            self._run_r_backend()
+        return True
+
+    def _revalidate(self):
+        """Valida novamente a partir da base bruta já carregada em memória"""
+        self.data = self.raw_data
+        return self.validate_data()
+
+    def watch(self, mode="rapido", interval=1.0, debounce=1.5):
+        """Monitora a base e o JSON de configuração e reexecuta apenas as etapas afetadas"""
+        print("Executando análise inicial...")
+        if mode == "completo":
+            self.run_complete_analysis()
+        else:
+            self.run_quick_analysis()
+
+        watched = {f"data:{p}": p for p in self._data_paths()}
+        watched["config"] = self.config_file
+        signatures = {k: self._file_signature(p) for k, p in watched.items()}
+        pending = {}
+
+        print(f"\nModo watch ativo: monitorando {', '.join(str(p) for p in watched.values() if p)}")
+        print("Pressione Ctrl+C para encerrar")
+
+        try:
+            while True:
+                time.sleep(interval)
+                now = time.monotonic()
+
+                for key, path in watched.items():
+                    signature = self._file_signature(path)
+                    if signature != signatures[key]:
+                        signatures[key] = signature
+                        pending[key] = now
+
+                # Debounce: espera o arquivo ficar estável antes de reprocessar
+                ready = [k for k, t in pending.items() if now - t >= debounce]
+                if not ready or len(ready) < len(pending):
+                    continue
+                pending.clear()
+
+                stage = None
+                if "config" in ready:
+                    old_config = self.config
+                    try:
+                        self.config = self._load_config(self.config_file, strict=True)
+                    except Exception as e:
+                        # JSON inválido (ex.: salvo pela metade): mantém a configuração anterior
+                        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Configuração inválida em "
+                              f"{self.config_file}: {e}; mantendo a configuração anterior")
+                        ready.remove("config")
+                    else:
+                        for key, value in self.config_overrides.items():
+                            if key in self.config:
+                                self.config[key] = value
+                        stage = self._stages_for_config_change(old_config)
+                        if stage == "load":
+                            watched = {f"data:{p}": p for p in self._data_paths()}
+                            watched["config"] = self.config_file
+                            signatures = {k: self._file_signature(p) for k, p in watched.items()}
+                if any(k.startswith("data:") for k in ready):
+                    stage = "load"
+                if stage is None:
+                    continue
+
+                started = time.perf_counter()
+                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Alteração detectada "
+                      f"({', '.join(k.split(':', 1)[-1] for k in ready)}); reexecutando a partir de '{stage}'")
+                if self._run_from_stage(stage, mode):
+                    print(f"Atualização concluída em {time.perf_counter() - started:.2f}s")
+                else:
+                    print("Atualização falhou. Aguardando nova alteração...")
+        except KeyboardInterrupt:
+            print("\nModo watch encerrado")
+        return True
+
     def convert_csv_to_excel(self, csv_file, output_file=None):
         """Converte arquivo CSV para Excel"""
         if not PANDAS_AVAILABLE:
@@ -621,8 +2352,15 @@ def main():
 Exemplos de uso:
   python main.py --mode rapido                    # Análise rápida (Python)
   python main.py --mode completo                  # Análise completa (Python + R)
+  python main.py --mode completo --backend-r rscript  # Saídas R via Rscript
   python main.py --from-csv dados.csv             # Converter CSV e analisar
   python main.py --saida resultados --mode rapido # Definir diretório de saída
+  python main.py --mode rapido --watch            # Reprocessar ao salvar a base
+  python main.py --mode rapido --max-memory 1G    # Limitar o uso de memória
+  python main.py --mode rapido --paineis          # Painéis por Região × Safra
+  python main.py --sample 500                     # Prévia por amostragem estratificada
+  python main.py --mode rapido --fontes safras.xlsx:* ce.csv pe.csv  # Várias fontes
+  python main.py --mode rapido --fontes safras.xlsx:2019,2020  # Abas selecionadas
         """
     )
     
@@ -632,6 +2370,8 @@ Exemplos de uso:
                        help='Converter CSV para Excel antes da análise')
     parser.add_argument('--base', metavar='ARQUIVO', default='base_agro.xlsx',
                        help='Arquivo de dados Excel (padrão: base_agro.xlsx)')
+    parser.add_argument('--fontes', metavar='ARQUIVO[:ABAS]', nargs='+',
+                       help='Várias fontes lidas em paralelo e unidas em uma base (abas por nome, índice ou curinga)')
     parser.add_argument('--saida', metavar='DIRETORIO', default='relatorios',
                        help='Diretório de saída (padrão: relatorios)')
     parser.add_argument('--rscript', metavar='CAMINHO', default='Rscript',
@@ -642,9 +2382,33 @@ Exemplos de uso:
                        help='Atalho para análise completa')
     parser.add_argument('--deps', action='store_true',
                        help='Verificar apenas dependências')
+    parser.add_argument('--outliers', choices=['iqr', 'mad', 'zscore', 'nenhum'],
+                       help='Método de detecção de outliers por grupo (padrão: iqr)')
+    parser.add_argument('--winsorizar', action='store_true',
+                       help='Winsorizar outliers em vez de apenas sinalizá-los')
+    parser.add_argument('--backend-r', choices=['nativo', 'rscript'],
+                       help='Backend das saídas do script R no modo completo (padrão: nativo)')
+    parser.add_argument('--paridade-r', metavar='DIRETORIO',
+                       help='Comparar as saídas nativas com as geradas pelo Rscript em DIRETORIO')
+    parser.add_argument('--max-memory', metavar='TAMANHO', type=AgroAnalysisSystem._parse_memory_size,
+                       help='Orçamento de memória (ex.: 512M, 2G); bases maiores são processadas em blocos')
+    parser.add_argument('--paineis', action='store_true',
+                       help='Gerar painéis de produtividade por Região × Safra com galeria HTML')
+    parser.add_argument('--sample', metavar='N', type=int,
+                       help='Prévia rápida com amostra estratificada (Cultura/Regiao/Safra) de até N registros por estrato')
+    parser.add_argument('--watch', action='store_true',
+                       help='Monitorar a base e a configuração e reprocessar a cada alteração')
     
     args = parser.parse_args()
     
+    if args.sample is not None:
+        if args.sample <= 0:
+            parser.error("--sample: N deve ser um inteiro positivo")
+        if args.watch:
+            parser.error("--sample não pode ser combinado com --watch")
+        if args.mode == 'completo' or args.all_in_one:
+            parser.error("--sample gera apenas a prévia Python; não use com --mode completo/--all-in-one")
+    
     print("Sistema Integrado de Análise do Agronegócio")
     print("Projeto Capítulo 7 - Python/R Integration")
     print("Desenvolvido por: Raimunda Nayara Mendes dos Santos (RM: 567718)")
@@ -658,8 +2422,20 @@ Exemplos de uso:
         config['r_script_path'] = args.rscript
     if args.base != 'base_agro.xlsx':
         config['data_file'] = args.base
+    if args.fontes:
+        config['data_sources'] = args.fontes
     if args.saida != 'relatorios':
         config['reports_dir'] = args.saida
+    if args.outliers:
+        config['outlier_method'] = args.outliers
+    if args.winsorizar:
+        config['outlier_action'] = 'winsorize'
+    if args.backend_r:
+        config['r_backend'] = args.backend_r
+    if args.max_memory:
+        config['max_memory_mb'] = args.max_memory
+    if args.paineis:
+        config['facet_panels'] = True
     
     sistema = AgroAnalysisSystem(**config)
     
@@ -681,18 +2457,31 @@ Exemplos de uso:
     if args.all_in_one:
         mode = 'completo'
     
+    if not mode and (args.watch or args.sample is not None):
+        mode = 'rapido'
+    
     if not mode:
         print("\nNenhum modo especificado. Use --mode rapido ou --mode completo")
         print("Use --help para ver todas as opções")
         sys.exit(1)
     
+    # Modo watch: mantém o processo ativo e reprocessa a cada alteração
+    if args.watch:
+        sistema.watch(mode)
+        return
+    
     # Executar análise
     success = False
-    if mode == 'rapido':
+    if args.sample is not None:
+        success = sistema.run_sample_analysis(args.sample)
+    elif mode == 'rapido':
         success = sistema.run_quick_analysis()
     elif mode == 'completo':
         success = sistema.run_complete_analysis()
     
+    if success and args.paridade_r:
+        success = sistema.compare_r_outputs(args.paridade_r)
+    
     if success:
         print(f"\nAnálise concluída com sucesso!")
         print(f"Resultados salvos em: {sistema.reports_dir.absolute()}")
@@ -0,0 +1,100 @@
+"""Carga de várias fontes (abas e CSVs) em uma única base"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+
+def _harvest(label, n=4):
+    return pd.DataFrame({
+        "Safra": [label] * n,
+        "Regiao": ["Sul", "Norte"] * (n // 2),
+        "Cultura": ["Arroz", "Feijão"] * (n // 2),
+        "Subtipo": ["Carioca"] * n,
+        "Produtividade_t_ha": [1.0, 2.0, 3.0, 4.0][:n],
+        "Nivel_Tecnologico": ["Alto"] * n,
+    })
+
+
+@pytest.fixture
+def sistema(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AgroAnalysisSystem()
+
+
+@pytest.fixture
+def labeled_workbook(tmp_path):
+    path = tmp_path / "safras.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for label in ["2021/22", "2022/23"]:
+            _harvest(label).to_excel(writer, sheet_name=label[:4], index=False)
+        pd.DataFrame({"nota": ["sem dados"]}).to_excel(writer, sheet_name="notas", index=False)
+    return path
+
+
+def test_labeled_sheets_keep_harvest_labels(sistema, labeled_workbook):
+    assert sistema.load_sources([f"{labeled_workbook}:20*"])
+
+    data = sistema.data
+    assert len(data) == 8
+    assert sorted(data["Safra"].unique()) == ["2021/22", "2022/23"]
+    assert list(data["Fonte"].cat.categories) == ["safras.xlsx[2021]", "safras.xlsx[2022]"]
+    assert (data.groupby("Fonte", observed=True)["Safra"].nunique() == 1).all()
+
+
+def test_labeled_and_numeric_sources_share_text_labels(sistema, labeled_workbook, tmp_path):
+    csv_path = tmp_path / "ce.csv"
+    _harvest(2020).to_csv(csv_path, index=False)
+
+    assert sistema.load_sources([f"{labeled_workbook}:2021", str(csv_path)])
+
+    assert set(sistema.data["Safra"]) == {"2021/22", "2020"}
+    assert list(AgroAnalysisSystem._safra_years(sorted(set(sistema.data["Safra"])))) == [2020, 2021]
+
+
+def test_numeric_sources_are_typed(sistema, tmp_path):
+    paths = []
+    for uf, safra in [("ce", 2020), ("pe", 2021)]:
+        paths.append(tmp_path / f"{uf}.csv")
+        _harvest(safra).to_csv(paths[-1], index=False)
+
+    assert sistema.load_sources([str(p) for p in paths])
+
+    assert sistema.data["Safra"].dtype == "int64"
+    assert sistema.data["Produtividade_t_ha"].dtype == "float64"
+
+
+def test_unparsed_harvest_labels_are_reported(sistema, tmp_path, capsys):
+    path = tmp_path / "ba.csv"
+    pd.concat([_harvest("2021/22"), _harvest("sem safra")]).to_csv(path, index=False)
+
+    assert sistema.load_sources([str(path)])
+
+    assert "sem safra" in set(sistema.data["Safra"])
+    assert "valores de Safra não reconhecidos como ano: sem safra" in capsys.readouterr().out
+
+
+def test_sources_missing_columns_are_skipped(sistema, labeled_workbook):
+    assert not sistema.load_sources([f"{labeled_workbook}:notas"])
+    assert sistema.source_info[0]["status"] == "ignorada"
+
+
+def test_parallel_ingestion_matches_sequential(tmp_path, monkeypatch, labeled_workbook):
+    monkeypatch.chdir(tmp_path)
+    csv_path = tmp_path / "ce.csv"
+    _harvest(2020).to_csv(csv_path, index=False)
+    specs = [f"{labeled_workbook}:20*", str(csv_path)]
+
+    sequential = AgroAnalysisSystem(ingest_workers=1)
+    parallel = AgroAnalysisSystem(ingest_workers=3)
+    assert sequential.load_sources(specs)
+    assert parallel.load_sources(specs)
+
+    pd.testing.assert_frame_equal(parallel.data, sequential.data)
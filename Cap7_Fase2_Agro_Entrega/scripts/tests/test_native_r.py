@@ -0,0 +1,80 @@
+"""Paridade do backend R nativo com as saídas geradas pelo Rscript"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+PROJECT_DIR = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+BASE_FILE = PROJECT_DIR / "src" / "base_agro.xlsx"
+REFERENCE_DIR = PROJECT_DIR / "document" / "relatorios"
+
+
+@pytest.fixture
+def native_outputs(tmp_path, monkeypatch):
+    """Executa a análise R nativa sobre a base do projeto em um diretório temporário"""
+    monkeypatch.chdir(tmp_path)
+    output_dir = tmp_path / "r_nativo"
+    sistema = AgroAnalysisSystem(data_file=str(BASE_FILE), r_output_dir=str(output_dir))
+    assert sistema.load_data()
+    assert sistema.run_native_r_analysis()
+    return output_dir
+
+
+@pytest.mark.parametrize("name", ["estatisticas_geral.csv", "estatisticas_por_cultura.csv"])
+def test_native_tables_match_rscript(native_outputs, name):
+    native = pd.read_csv(native_outputs / name)
+    reference = pd.read_csv(REFERENCE_DIR / name)
+    pd.testing.assert_frame_equal(native, reference, check_dtype=False, rtol=1e-9)
+
+
+def test_compare_r_outputs_reports_parity(native_outputs):
+    sistema = AgroAnalysisSystem(r_output_dir=str(native_outputs))
+    assert sistema.compare_r_outputs(REFERENCE_DIR)
+
+
+def test_compare_r_outputs_detects_divergence(native_outputs, tmp_path):
+    reference = tmp_path / "referencia"
+    reference.mkdir()
+    for csv in REFERENCE_DIR.glob("*.csv"):
+        (reference / csv.name).write_text(csv.read_text(encoding="utf-8"), encoding="utf-8")
+    geral = pd.read_csv(reference / "estatisticas_geral.csv")
+    geral["media"] += 1e-6
+    geral.to_csv(reference / "estatisticas_geral.csv", index=False)
+
+    sistema = AgroAnalysisSystem(r_output_dir=str(native_outputs))
+    assert not sistema.compare_r_outputs(reference)
+
+
+def test_r_mean_matches_two_pass_mean():
+    values = np.array([0.8, 1.2, 1.5, 3.9, 2.45])
+    assert AgroAnalysisSystem._r_mean(values) == pytest.approx(1.97, rel=0, abs=1e-15)
+
+
+def test_e1071_skewness_type3():
+    # e1071::skewness(c(1, 2, 3, 4, 10)) = 36 / 12.5^1.5
+    values = np.array([1, 2, 3, 4, 10], dtype=float)
+    assert AgroAnalysisSystem._e1071_skewness(values) == pytest.approx(0.8145870119269, rel=1e-12)
+    assert AgroAnalysisSystem._e1071_skewness(-values) == pytest.approx(-0.8145870119269, rel=1e-12)
+    assert AgroAnalysisSystem._e1071_skewness(np.arange(1.0, 8.0)) == pytest.approx(0.0, abs=1e-15)
+
+
+def test_e1071_kurtosis_type3():
+    # e1071::kurtosis(c(1, 2, 3, 4, 10)) = 278.8 / 12.5^2 - 3
+    values = np.array([1, 2, 3, 4, 10], dtype=float)
+    assert AgroAnalysisSystem._e1071_kurtosis(values) == pytest.approx(-1.21568, rel=1e-12)
+    # c(1, 2, 3, 4): m4 = 2.5625, s² amostral = 5/3
+    assert AgroAnalysisSystem._e1071_kurtosis(np.array([1.0, 2.0, 3.0, 4.0])) == pytest.approx(
+        2.5625 / (5 / 3) ** 2 - 3, rel=1e-12)
+
+
+def test_e1071_empty_input_is_nan():
+    assert np.isnan(AgroAnalysisSystem._e1071_skewness(np.array([])))
+    assert np.isnan(AgroAnalysisSystem._e1071_kurtosis(np.array([])))
@@ -0,0 +1,53 @@
+"""Execução em blocos (out-of-core) comparada à execução em memória"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+TREND_KEYS = ["Cultura", "Regiao", "Nivel_Tecnologico", "Safra"]
+
+
+@pytest.fixture
+def base_csv(tmp_path):
+    rng = np.random.default_rng(7)
+    n = 3000
+    safra = rng.integers(2015, 2023, n)
+    pd.DataFrame({
+        "Safra": safra,
+        "Regiao": rng.choice(["Sul", "Norte", "Nordeste"], n),
+        "Cultura": rng.choice(["Arroz", "Feijão"], n),
+        "Subtipo": rng.choice(["Carioca", "Preto"], n),
+        "Produtividade_t_ha": 2 + 0.1 * (safra - 2015) + rng.normal(0, 0.2, n),
+        "Nivel_Tecnologico": rng.choice(["Baixo", "Alto"], n),
+    }).to_csv(tmp_path / "base.csv", index=False)
+    return tmp_path / "base.csv"
+
+
+def _trends(tmp_path, name):
+    frame = pd.read_csv(tmp_path / "relatorios" / name)
+    return frame.sort_values(list(frame.columns[:3])).reset_index(drop=True)
+
+
+def test_block_trends_match_in_memory(tmp_path, monkeypatch, base_csv):
+    monkeypatch.chdir(tmp_path)
+
+    sistema = AgroAnalysisSystem(data_file=str(base_csv), outlier_method="nenhum")
+    assert sistema.run_quick_analysis()
+    in_memory = _trends(tmp_path, "tendencias.csv").sort_values(TREND_KEYS).reset_index(drop=True)
+    summary = _trends(tmp_path, "tendencias_resumo.csv")
+
+    # Muitos blocos pequenos: o acumulador de células é reagrupado a cada bloco
+    sistema = AgroAnalysisSystem(data_file=str(base_csv), max_memory_mb=10_000)
+    assert sistema.run_out_of_core_analysis(chunk_rows=100)
+    blocks = _trends(tmp_path, "tendencias.csv").sort_values(TREND_KEYS).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(blocks, in_memory, rtol=1e-9)
+    pd.testing.assert_frame_equal(_trends(tmp_path, "tendencias_resumo.csv"), summary, rtol=1e-9)
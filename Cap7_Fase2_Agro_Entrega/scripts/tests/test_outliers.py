@@ -0,0 +1,72 @@
+"""Detecção de outliers por grupo"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+# Grupo com entrada arredondada: IQR e MAD são zero
+ROUNDED_GROUP = [1.2] * 5 + [1.3, 1.1, 1.2] + [12.0]
+
+
+def _system(tmp_path, monkeypatch, values, **config):
+    monkeypatch.chdir(tmp_path)
+    sistema = AgroAnalysisSystem(**config)
+    sistema.data = pd.DataFrame({
+        "Cultura": "Feijão", "Regiao": "Sul", "Safra": 2023, "Produtividade_t_ha": values,
+    })
+    return sistema
+
+
+@pytest.mark.parametrize("method", ["iqr", "mad"])
+def test_zero_spread_group_is_assessed(tmp_path, monkeypatch, method):
+    sistema = _system(tmp_path, monkeypatch, ROUNDED_GROUP, outlier_method=method)
+
+    assert sistema.detect_outliers()
+
+    flags = sistema.data["Outlier_Produtividade_t_ha"].to_numpy()
+    assert flags.tolist() == [False] * 8 + [True]
+    report = pd.read_csv(tmp_path / "relatorios" / "outliers_por_grupo.csv")
+    assert report[["Cultura", "Regiao", "Safra", "outliers"]].values.tolist() == [["Feijão", "Sul", 2023, 1]]
+
+
+def test_iqr_min_spread_is_configurable(tmp_path, monkeypatch):
+    sistema = _system(tmp_path, monkeypatch, ROUNDED_GROUP, outlier_method="iqr", outlier_min_spread=10.0)
+
+    assert sistema.detect_outliers()
+
+    assert not sistema.data["Outlier_Produtividade_t_ha"].any()
+
+
+def test_constant_group_has_no_outliers(tmp_path, monkeypatch):
+    sistema = _system(tmp_path, monkeypatch, [1.5] * 8, outlier_method="mad")
+
+    assert sistema.detect_outliers()
+
+    assert not sistema.data["Outlier_Produtividade_t_ha"].any()
+
+
+def test_explicit_zero_threshold_is_respected(tmp_path, monkeypatch):
+    values = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    sistema = _system(tmp_path, monkeypatch, values, outlier_method="zscore", outlier_threshold=0)
+
+    assert sistema.detect_outliers()
+
+    # Limiar zero: todo valor diferente da média é sinalizado
+    assert sistema.data["Outlier_Produtividade_t_ha"].all()
+
+
+def test_winsorize_clips_to_group_bounds(tmp_path, monkeypatch):
+    sistema = _system(tmp_path, monkeypatch, ROUNDED_GROUP, outlier_method="iqr", outlier_action="winsorize")
+
+    assert sistema.detect_outliers()
+
+    assert sistema.data["Produtividade_t_ha"].max() == pytest.approx(1.2 + 1.5 * 0.1)
+    assert np.allclose(sistema.data["Produtividade_t_ha"].to_numpy()[:8], ROUNDED_GROUP[:8])
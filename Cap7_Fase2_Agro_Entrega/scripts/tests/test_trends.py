@@ -0,0 +1,70 @@
+"""Tendências entre safras"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+# Três séries reais em um produto cartesiano de 3 × 3 × 3 combinações possíveis
+SERIES = [("Arroz", "Sul", "Alto", 2.0, 0.10),
+          ("Feijão", "Norte", "Baixo", 1.0, -0.05),
+          ("Soja", "Nordeste", "Médio", 3.0, 0.20)]
+
+
+def _trend_base(safras):
+    rows = []
+    for cultura, regiao, nivel, base, slope in SERIES:
+        for i, safra in enumerate(safras):
+            for noise in (-0.01, 0.01):
+                rows.append({"Safra": safra, "Regiao": regiao, "Cultura": cultura, "Subtipo": None,
+                             "Produtividade_t_ha": base + slope * i + noise, "Nivel_Tecnologico": nivel})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def sistema(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AgroAnalysisSystem(outlier_method="nenhum")
+
+
+def _run(sistema, data):
+    sistema.data = data
+    sistema.raw_data = data
+    assert sistema.validate_data()
+    assert sistema.generate_trends()
+    return (pd.read_csv(sistema.reports_dir / "tendencias.csv"),
+            pd.read_csv(sistema.reports_dir / "tendencias_resumo.csv"))
+
+
+def test_sparse_categorical_combinations_only_report_observed_series(sistema):
+    trends, summary = _run(sistema, _trend_base([2019, 2020, 2021, 2022]))
+
+    assert len(summary) == 3
+    assert len(trends) == 12
+    assert trends["registros"].dtype == "int64"
+    slopes = summary.set_index("Cultura")["inclinacao_t_ha_safra"]
+    assert slopes.to_dict() == pytest.approx({"Arroz": 0.10, "Feijão": -0.05, "Soja": 0.20})
+
+
+def test_harvest_labels_use_leading_year(sistema):
+    trends, summary = _run(sistema, _trend_base(["2019/20", "2020/21", "2021/22"]))
+
+    assert sorted(trends["Safra"].unique()) == [2019, 2020, 2021]
+    assert (summary["primeira_safra"] == 2019).all()
+    assert (summary["ultima_safra"] == 2021).all()
+
+
+def test_missing_safra_skips_stage_and_removes_stale_outputs(sistema):
+    _run(sistema, _trend_base([2019, 2020]))
+
+    sistema.data = _trend_base([2019, 2020]).drop(columns="Safra")
+    assert sistema.generate_trends()
+
+    assert not (sistema.reports_dir / "tendencias.csv").exists()
+    assert not (sistema.reports_dir / "tendencias_resumo.csv").exists()
@@ -0,0 +1,44 @@
+"""Recarga de configuração no modo --watch"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from main import AgroAnalysisSystem  # noqa: E402
+
+
+@pytest.fixture
+def sistema(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"outlier_method": "nenhum"}), encoding="utf-8")
+    return AgroAnalysisSystem(config_file=str(config_file))
+
+
+def test_invalid_json_raises_in_strict_mode(sistema, tmp_path):
+    (tmp_path / "config.json").write_text('{"outlier_method": "nenhum",}', encoding="utf-8")
+
+    with pytest.raises(json.JSONDecodeError):
+        sistema._load_config(sistema.config_file, strict=True)
+    # Fora do modo estrito o comportamento original (padrões) é mantido
+    assert sistema._load_config(sistema.config_file)["outlier_method"] == "iqr"
+
+
+@pytest.mark.parametrize("key, value, stage", [
+    ("chart_dpi", 80, "charts"),
+    ("facet_panels", True, "charts"),
+    ("trend_window", 5, "trends"),
+    ("outlier_method", "mad", "validate"),
+    ("max_memory_mb", 512, "load"),
+    ("data_sources", ["a.csv"], "load"),
+    ("autora", "Outra", "report"),
+])
+def test_stage_for_config_change(sistema, key, value, stage):
+    old_config = dict(sistema.config)
+    sistema.config[key] = value
+    assert sistema._stages_for_config_change(old_config) == stage